@@ -0,0 +1,116 @@
+import numpy as np
+import cv2
+
+
+# One record per detected blob; shared by the tracker and the MIDI stage
+BLOB_DTYPE = np.dtype([
+    ('x', np.float32),             # Centroid x in image pixels
+    ('y', np.float32),             # Centroid y in image pixels
+    ('size', np.float32),          # Keypoint diameter from the blob detector
+    ('area', np.float32),          # Number of pixels in the blob
+    ('orientation', np.float32),   # Major axis angle in radians (-pi/2 to pi/2)
+    ('eccentricity', np.float32),  # 0 for a round blob, towards 1 when elongated
+    ('pressure', np.float32),      # Pressure integral (sum of darkness over the blob)
+    ('peak', np.float32),          # Pressure peak (darkest pixel in the blob)
+])
+
+
+class BlobFeatureExtractor:
+    def __init__(self, max_blobs=64):
+        """
+        Compute moment-based shape features for detected blobs.
+        :param max_blobs: Capacity of the per-frame feature array.
+        """
+        self.max_blobs = max_blobs
+        # Preallocated once; extract() returns a view of the first N rows
+        self.features = np.zeros(max_blobs, dtype=BLOB_DTYPE)
+
+    def extract(self, keypoints, thresholded_img, pressure_img):
+        """
+        Fill the feature array for this frame's keypoints.
+        All blobs are measured in one pass over the blob pixels.
+        :param keypoints: Keypoints returned by the blob detector.
+        :param thresholded_img: Binary image the detector ran on (blobs are 0).
+        :param pressure_img: Grayscale image where darker means more pressure.
+        :return: View of the feature array with one row per keypoint.
+        """
+        count = min(len(keypoints), self.max_blobs)
+        features = self.features[:count]
+        if count == 0:
+            return features
+
+        # Keypoint centres and sizes straight from the detector
+        points = np.array([kp.pt for kp in keypoints[:count]], dtype=np.float32)
+        features['x'] = points[:, 0]
+        features['y'] = points[:, 1]
+        features['size'] = [kp.size for kp in keypoints[:count]]
+
+        # Label the dark regions once, then find which label each keypoint sits on
+        mask = (thresholded_img == 0).astype(np.uint8)
+        num_labels, labels = cv2.connectedComponents(mask, connectivity=8)
+        height, width = labels.shape
+        px = np.clip(np.rint(points[:, 0]).astype(np.intp), 0, width - 1)
+        py = np.clip(np.rint(points[:, 1]).astype(np.intp), 0, height - 1)
+        blob_labels = labels[py, px]
+
+        # Ring-shaped blobs can have a centre outside the blob; use the dominant label nearby
+        for i in np.flatnonzero(blob_labels == 0):
+            radius = max(1, int(keypoints[i].size // 2))
+            roi = labels[max(0, py[i] - radius):py[i] + radius + 1,
+                         max(0, px[i] - radius):px[i] + radius + 1]
+            roi = roi[roi > 0]
+            if roi.size:
+                blob_labels[i] = np.bincount(roi).argmax()
+
+        # Only blob pixels take part in the moment sums
+        flat_labels = labels.ravel()
+        pixel_index = np.flatnonzero(flat_labels)
+        pixel_label = flat_labels[pixel_index]
+        ys, xs = np.divmod(pixel_index, width)
+        xs = xs.astype(np.float64)
+        ys = ys.astype(np.float64)
+        weights = 255.0 - pressure_img.ravel()[pixel_index]
+
+        # Raw moments for every label
+        m00 = np.bincount(pixel_label, minlength=num_labels).astype(np.float64)
+        m10 = np.bincount(pixel_label, xs, minlength=num_labels)
+        m01 = np.bincount(pixel_label, ys, minlength=num_labels)
+        m20 = np.bincount(pixel_label, xs * xs, minlength=num_labels)
+        m02 = np.bincount(pixel_label, ys * ys, minlength=num_labels)
+        m11 = np.bincount(pixel_label, xs * ys, minlength=num_labels)
+        pressure = np.bincount(pixel_label, weights, minlength=num_labels)
+        peak = np.zeros(num_labels)
+        np.maximum.at(peak, pixel_label, weights)
+
+        # Gather the labels that belong to keypoints
+        found = blob_labels > 0
+        lab = blob_labels[found]
+        area = m00[lab]
+        cx = m10[lab] / area
+        cy = m01[lab] / area
+
+        # Central second moments give the blob's ellipse
+        mu20 = m20[lab] / area - cx * cx
+        mu02 = m02[lab] / area - cy * cy
+        mu11 = m11[lab] / area - cx * cy
+        spread = np.sqrt(((mu20 - mu02) / 2) ** 2 + mu11 ** 2)
+        major = (mu20 + mu02) / 2 + spread
+        minor = (mu20 + mu02) / 2 - spread
+        eccentricity = np.sqrt(
+            np.clip(1 - minor / np.where(major > 0, major, 1), 0, 1))
+
+        features['area'] = 0
+        features['orientation'] = 0
+        features['eccentricity'] = 0
+        features['pressure'] = 0
+        features['peak'] = 0
+
+        features['x'][found] = cx
+        features['y'][found] = cy
+        features['area'][found] = area
+        features['orientation'][found] = 0.5 * np.arctan2(2 * mu11, mu20 - mu02)
+        features['eccentricity'][found] = np.where(major > 0, eccentricity, 0)
+        features['pressure'][found] = pressure[lab]
+        features['peak'][found] = peak[lab]
+
+        return features
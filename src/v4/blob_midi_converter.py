@@ -0,0 +1,307 @@
+import numpy as np
+import mido
+from midi_note_class import MIDINote
+from midi_port_pool import get_output_port
+from midi_sender import MIDISender
+from controller_filter import ControllerFilter
+from pitch_bend_curves import PitchBendCurve
+from mpe import MPEChannelAllocator, mpe_configuration_messages, rpn_messages, \
+    note_expression_messages
+from event_log import event_log
+
+
+class BlobToMIDIConverter:
+    def __init__(self, note_grid, midi_port, max_tracks=32, mpe=False, pitch_bend_range=12,
+                 sink=None, padding_offset=30, original_size=(600, 300),
+                 window_size=(780, 390), velocity_estimator=None, stream_pressure=True,
+                 pressure_range=(2e4, 6e5)):
+        """
+        Initialize the BlobToMIDIConverter with a note grid and MIDI output port.
+        :param note_grid: Instance of MIDINoteGrid that represents the note grid.
+        :param midi_port: MIDI output port for sending MIDI messages.
+        :param max_tracks: Slot count of the tracker's TrackTable.
+        :param mpe: Give every touch its own MPE member channel with per-note expression.
+        :param pitch_bend_range: Pitch bend range in semitones.
+        :param sink: Output to use instead of opening midi_port (see midi_sinks).
+        :param padding_offset: Border added around the sensor image (pixels).
+        :param original_size: (width, height) the note grid is laid out in, padding included.
+        :param window_size: (width, height) of the image the touch positions are measured in.
+        :param velocity_estimator: VelocityEstimator for pressure-based note-on velocity;
+                                   None keeps the blob-size velocity.
+        :param stream_pressure: Send pressure while a note sounds (poly aftertouch, or
+                                channel pressure on the note's channel in MPE mode).
+        :param pressure_range: Blob pressure integral mapped to aftertouch 0 and 127.
+        """
+        self.note_grid = note_grid
+        self.midi_port = midi_port
+
+        # Screen geometry used to map touch positions onto the grid
+        self.padding_offset = padding_offset
+        self.original_width, self.original_height = original_size
+        self.effective_width = self.original_width - (2 * padding_offset)
+        self.effective_height = self.original_height - (2 * padding_offset)
+        self.window_width, self.window_height = window_size
+
+        # Open the port now so the first note-on does not pay for port creation;
+        # all messages leave through the sender thread, never from the frame loop
+        if sink is None:
+            sink = get_output_port(midi_port)
+        self.sender = MIDISender(sink)
+        # Controller streams are thinned out before they are queued
+        self.output = ControllerFilter(self.sender)
+        self.tracks = None  # TrackTable from the last process_blobs call
+
+        # Per-slot note state, parallel to the TrackTable rows
+        self.note_owner = np.full(max_tracks, -1, dtype=np.int64)  # Track ID holding the note
+        self.start_col = np.zeros(max_tracks, dtype=np.int64)
+        self.start_pitch = np.zeros(max_tracks)  # Start cell's note plus microtuning offset
+        # Pitch of every column in the start row, taken when the note starts, so a held note
+        # keeps sliding on the grid it started on when a preset or layout switches under it
+        self.slide_pitches = np.full((max_tracks, note_grid.columns), np.nan)
+        self.initial_rel_x = np.zeros(max_tracks)  # Initial position within the cell
+        self.tuning_bend = np.zeros(max_tracks, dtype=np.int64)  # Microtuning offset (MPE only)
+        self.notes = [None] * max_tracks  # MIDINote per slot
+
+        self.velocity_estimator = velocity_estimator
+        self.stream_pressure = stream_pressure
+        self.pressure_range = pressure_range
+        self.pitch_bend_range = pitch_bend_range
+        self.bend_curve = PitchBendCurve(pitch_bend_range=pitch_bend_range)
+        self.channels = MPEChannelAllocator()
+        self.mpe = False
+        if mpe:
+            self.set_mpe(True)
+
+    def process_blobs(self, tracks):
+        """
+        Process blobs and handle MIDI note triggering based on their presence in the note grid.
+        :param tracks: TrackTable from PersistentBlobTracker.update_blobs.
+        """
+        self.tracks = tracks
+
+        # Stop notes whose touch ended first, so a reused slot can start a new one
+        self._stop_disappeared_blobs(tracks)
+
+        # Grid geometry and pitch bend for every confirmed touch at once
+        slots = np.flatnonzero(tracks.active)
+        grid_x, grid_y, rows, cols, rel_x = self._grid_positions(tracks, slots)
+        midi_notes = self.note_grid.notes_at(rows, cols)
+        # Column slides bend by the interval the note's layout put between the start cell and
+        # the current cell of the same row; a silent or off-grid cell bends back to the start note
+        inside = cols >= 0
+        semitones = np.where(inside, self.slide_pitches[slots, np.where(inside, cols, 0)],
+                             np.nan) - self.start_pitch[slots]
+        pitch_bends = self.bend_curve.bend(
+            rel_x - self.initial_rel_x[slots], cols - self.start_col[slots],
+            np.nan_to_num(semitones))
+        pressures = self._pressure_values(tracks, slots)
+        if self.mpe:
+            # Each note's own channel carries its microtuning offset on top of the expression
+            pitch_bends = np.clip(pitch_bends + self.tuning_bend[slots], -8192, 8191)
+
+        # Iterate over each confirmed touch
+        for i, slot in enumerate(slots.tolist()):
+
+            blob_id = int(tracks.id[slot])
+            size = int(tracks.size[slot])
+            row, col = int(rows[i]), int(cols[i])
+
+            if row >= 0:
+                midi_note = int(midi_notes[i])
+
+                # Check if this blob is already active on this note
+                if self.note_owner[slot] != blob_id:
+                    if midi_note < 0:
+                        continue  # Silent cell in this layout
+
+                    if self.velocity_estimator is not None:
+                        velocity = self.velocity_estimator.estimate(slot, blob_id, size)
+                        if velocity is None:
+                            continue  # Note-on held back while the strike is measured
+                    else:
+                        # Calculate velocity as twice the blob size, clamped to 1–127
+                        velocity = max(1, min(127, int(size * 2)))
+
+                    # Start a new note and record the initial position
+                    initial_rel_x = rel_x[i]
+                    if self.mpe:
+                        channel = self._allocate_channel(slot)
+                        # Offsets were precomputed when the tuning was loaded
+                        tuning_bend = int(round(self.note_grid.bend_offsets[row, col] *
+                                                (8192 // self.pitch_bend_range)))
+                        self.tuning_bend[slot] = tuning_bend
+                        # Per-note controllers start from neutral before the note sounds;
+                        # forced past the filter so the channel never keeps the last note's bend
+                        for msg in note_expression_messages(
+                                channel, tuning_bend, int(pressures[i]), self._slide(grid_y[i])):
+                            self.output.send(msg, force=True)
+                    else:
+                        channel = blob_id % 16
+                    note = MIDINote(midi_channel=channel, midi_note=midi_note, velocity=velocity)
+                    note.output_port = self.output
+                    note.send_note_on()
+                    self.notes[slot] = note
+                    self.note_owner[slot] = blob_id
+                    self.start_col[slot] = col
+                    self.slide_pitches[slot] = self.note_grid.pitches_at(
+                        np.full(self.note_grid.columns, row), np.arange(self.note_grid.columns))
+                    self.start_pitch[slot] = midi_note + self.note_grid.bend_offsets[row, col]
+                    self.initial_rel_x[slot] = initial_rel_x  # Store initial position
+                    tracks.note[slot] = midi_note
+
+                    event_log.info("note", "Blob {} started note {} with velocity {}", blob_id,
+                                   self.note_grid.midi_to_note_name(midi_note), velocity)
+
+                else:
+                    # Apply pitch bend based on blob position
+                    note = self.notes[slot]
+                    if note is None:
+                        continue  # Silenced by a channel steal until the touch ends
+                    pitch_bend = int(pitch_bends[i])
+                    event_log.debug("bend", "Blob {}: Applied Pitch Bend {}", blob_id, pitch_bend)
+                    if self.mpe:
+                        for msg in note_expression_messages(
+                                note.midi_channel, pitch_bend,
+                                int(pressures[i]), self._slide(grid_y[i])):
+                            self.output.send(msg)
+                    elif note.output_port:
+                        note.output_port.send(
+                            mido.Message(
+                                'pitchwheel', channel=note.midi_channel, pitch=pitch_bend)
+                        )
+                        if self.stream_pressure:
+                            note.output_port.send(mido.Message(
+                                'polytouch', channel=note.midi_channel, note=note.midi_note,
+                                value=int(pressures[i])))
+
+        # Resting values of controllers that stopped moving
+        self.output.flush()
+
+    def set_mpe(self, enabled):
+        """
+        Switch MPE mode on or off, sending the MPE Configuration Message for the zone.
+        Sounding notes are stopped first because their channels change meaning.
+        """
+        self.stop_all_notes()
+        self.channels.reset()
+        self.mpe = enabled
+        if enabled:
+            messages = mpe_configuration_messages(self.channels, self.pitch_bend_range)
+        else:
+            messages = rpn_messages(self.channels.master_channel, 6, 0)  # Zone with no members
+        for msg in messages:
+            self.output.send(msg)
+
+    def _allocate_channel(self, slot):
+        """Pick a member channel for a new note, stopping the oldest note if all are busy."""
+        channel, stolen = self.channels.allocate(slot)
+        if stolen is not None:
+            # The channel already belongs to the new note; only silence the old one.
+            # Its touch keeps ownership of the slot, so it does not retrigger next frame.
+            note = self.notes[stolen]
+            self.notes[stolen] = None
+            if self.tracks is not None:
+                self.tracks.note[stolen] = -1
+            self.output.send(mido.Message(
+                'note_off', channel=note.midi_channel, note=note.midi_note))
+        return channel
+
+    def _pressure_values(self, tracks, slots):
+        """
+        Aftertouch 0-127 for the given touches at once, from the pressure integral the
+        feature extractor computes in the same pass as the centroids.
+        """
+        if not self.stream_pressure:
+            return np.zeros(len(slots), dtype=np.int64)
+        low, high = self.pressure_range
+        level = np.clip((tracks.pressure[slots] - low) / (high - low), 0, 1)
+        return np.rint(level * 127).astype(np.int64)
+
+    def _slide(self, grid_y):
+        """Slide (CC74) 0-127 from the vertical position within the cell."""
+        cell_height = self.effective_height // len(self.note_grid.grid)
+        return min(127, (grid_y % cell_height) * 128 // cell_height)
+
+    def _note_off(self, note):
+        """Send a note-off and give its MPE channel back to the pool."""
+        self.output.send(mido.Message(
+            'note_off', channel=note.midi_channel, note=note.midi_note))
+        if self.mpe:
+            self.channels.release(note.midi_channel)
+
+    def _grid_positions(self, tracks, slots):
+        """
+        Note grid position of the given touches, computed for all of them at once.
+        :return: Tuple of (grid_x, grid_y, rows, cols, rel_x); rows and cols are -1 outside
+                 the grid and rel_x is the horizontal position within the cell (0-1).
+        """
+        x = tracks.x[slots].astype(np.int64)
+        y = tracks.y[slots].astype(np.int64)
+
+        # the calculation below is makeshift and SUCKS but works for now; make it better
+        grid_x, grid_y = self._grid_coordinates(x, y)
+
+        n_rows, n_cols = len(self.note_grid.grid), self.note_grid.columns
+        cols = (grid_x - self.padding_offset) * n_cols // self.effective_width
+        rows = (grid_y - self.padding_offset) * n_rows // self.effective_height
+        outside = (rows < 0) | (rows >= n_rows) | (cols < 0) | (cols >= n_cols)
+        rows[outside] = -1
+        cols[outside] = -1
+
+        cell_width = self.effective_width // n_cols
+        rel_x = (grid_x % cell_width) / cell_width
+        return grid_x, grid_y, rows, cols, rel_x
+
+    def _grid_coordinates(self, x, y):
+        """Scale window coordinates (scalars or arrays) to the padded grid's coordinates."""
+        offset = self.padding_offset * (self.effective_width // self.window_width) + \
+            (self.padding_offset//2) - 5
+        grid_x = x * self.effective_width // self.window_width + offset
+        grid_y = y * self.effective_height // self.window_height + offset
+        return grid_x, grid_y
+
+    def _stop_disappeared_blobs(self, tracks):
+        """
+        Stop and clear notes for blobs that have disappeared.
+        :param tracks: Current frame's TrackTable.
+        """
+        # Slots holding a note whose touch is gone (or whose slot now holds another touch)
+        disappeared = (self.note_owner >= 0) & (
+            ~tracks.active | (tracks.id != self.note_owner))
+
+        for slot in np.flatnonzero(disappeared).tolist():
+            blob_id = int(self.note_owner[slot])
+            note = self._release_slot(slot)
+            if note is None:
+                continue  # Silenced earlier by a channel steal
+            note_name = self.note_grid.midi_to_note_name(
+                note.midi_note)  # Get note name
+
+            # Send a MIDI note-off message
+            self._note_off(note)
+            event_log.info("note", "Blob {} stopped note {}", blob_id, note_name)
+
+            # Clear the note grid block color here (customize as needed)
+
+    def _release_slot(self, slot):
+        """Clear a slot's note state and return its MIDINote (None if it was silenced)."""
+        note = self.notes[slot]
+        self.notes[slot] = None
+        self.note_owner[slot] = -1
+        if self.tracks is not None:
+            self.tracks.note[slot] = -1
+        return note
+
+    def stop_all_notes(self):
+        """Stops all active notes by sending note_off messages."""
+        for slot in np.flatnonzero(self.note_owner >= 0).tolist():
+            # Remove the note from active notes after stopping it
+            note = self._release_slot(slot)
+            if note is not None:
+                self._note_off(note)
+        event_log.info("note", "All active notes stopped.")
+
+    def close(self):
+        """Stop sounding notes and let the sender thread deliver everything still queued."""
+        self.stop_all_notes()
+        self.sender.close()
@@ -0,0 +1,503 @@
+import heapq
+import numpy as np
+import time
+from blob_features import BLOB_DTYPE
+from track_history import TrackHistory
+
+
+def solve_assignment(cost):
+    """
+    Minimum-cost assignment between the rows and columns of a cost matrix.
+    Shortest augmenting path form of the Hungarian algorithm; each inner step is one
+    vectorized pass over the columns.
+    :param cost: (rows, cols) array of non-negative costs.
+    :return: Tuple of (row indices, column indices) of the assigned pairs.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    # Potentials and column -> row matching (1-based, column 0 is the virtual start)
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.intp)
+    way = np.zeros(m + 1, dtype=np.intp)
+    reduced = np.empty(m + 1)
+    reduced[0] = np.inf
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        # Grow the alternating tree until a free column is reached
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            reduced[1:] = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv)
+            minv[better] = reduced[better]
+            way[better] = j0
+            masked = np.where(free, minv, np.inf)
+            j1 = int(masked.argmin())
+            delta = masked[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.flatnonzero(p[1:])
+    rows = p[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def greedy_assignment(cost, threshold):
+    """
+    Gated greedy assignment: take the cheapest remaining pair below the threshold
+    until no pair is left. Each row and column is used at most once.
+    :return: Tuple of (row indices, column indices) of the assigned pairs.
+    """
+    rows, cols = np.nonzero(cost < threshold)
+    return greedy_pairs(rows, cols, cost[rows, cols])
+
+
+def greedy_pairs(rows, cols, cost):
+    """Greedy assignment over an explicit list of candidate pairs."""
+    order = np.argsort(cost, kind='stable')
+    row_used = set()
+    col_used = set()
+    keep = []
+    for k in order.tolist():
+        r, c = rows[k], cols[k]
+        if r not in row_used and c not in col_used:
+            row_used.add(r)
+            col_used.add(c)
+            keep.append(k)
+    keep = np.array(keep, dtype=np.intp)
+    return rows[keep], cols[keep]
+
+
+def sparse_assignment(rows, cols, cost, big):
+    """
+    Optimal assignment over candidate pairs, solved separately for every connected
+    group of rows and columns so the work grows with the number of pairs.
+    :param rows: Row index of each candidate pair.
+    :param cols: Column index of each candidate pair.
+    :param cost: Cost of each candidate pair.
+    :param big: Cost used for pairs that are not candidates.
+    :return: Tuple of (row indices, column indices) of the assigned pairs.
+    """
+    if len(rows) == 0:
+        return rows, cols
+
+    # Fast path: every row's cheapest candidate is a different column
+    order = np.lexsort((cost, rows))
+    first = np.r_[True, rows[order][1:] != rows[order][:-1]]
+    best = order[first]
+    if len(np.unique(cols[best])) == len(best):
+        return rows[best], cols[best]
+
+    # Connected components of the bipartite candidate graph by label propagation
+    row_nodes, row_index = np.unique(rows, return_inverse=True)
+    col_nodes, col_index = np.unique(cols, return_inverse=True)
+    col_index = col_index + len(row_nodes)
+    label = np.arange(len(row_nodes) + len(col_nodes))
+    while True:
+        edge_label = np.minimum(label[row_index], label[col_index])
+        updated = label.copy()
+        np.minimum.at(updated, row_index, edge_label)
+        np.minimum.at(updated, col_index, edge_label)
+        updated = updated[updated]
+        if np.array_equal(updated, label):
+            break
+        label = updated
+
+    # Components whose rows all want different columns keep their cheapest pairs
+    component = label[row_index]
+    best_cols = cols[best]
+    _, col_first, col_count = np.unique(best_cols, return_index=True, return_counts=True)
+    contested = np.zeros(len(label), dtype=bool)
+    contested[component[best[col_first[col_count > 1]]]] = True
+    calm = best[~contested[component[best]]]
+    matched_rows, matched_cols = [rows[calm]], [cols[calm]]
+
+    # Solve each contested component on its own small dense matrix
+    edges = np.flatnonzero(contested[component])
+    groups = edges[np.argsort(component[edges], kind='stable')]
+    bounds = np.flatnonzero(np.diff(component[groups])) + 1
+    for group in np.split(groups, bounds):
+        sub_rows, r = np.unique(row_index[group], return_inverse=True)
+        sub_cols, c = np.unique(col_index[group], return_inverse=True)
+        dense = np.full((len(sub_rows), len(sub_cols)), float(big))
+        dense[r, c] = cost[group]
+        a, b = solve_assignment(dense)
+        keep = dense[a, b] < big
+        matched_rows.append(row_nodes[sub_rows[a[keep]]])
+        matched_cols.append(col_nodes[sub_cols[b[keep]] - len(row_nodes)])
+    return np.concatenate(matched_rows), np.concatenate(matched_cols)
+
+
+class SpatialHashIndex:
+    # Cell coordinates are packed into one int64 key: cx * KEY_STRIDE + cy
+    KEY_STRIDE = 1 << 24
+    KEY_OFFSET = 1 << 23
+
+    def __init__(self, cell_size):
+        """
+        Uniform grid of buckets for finding nearby points without comparing every pair.
+        :param cell_size: Bucket edge length; use the matching distance so every
+                          match lies in the query's own or a neighbouring bucket.
+        """
+        self.cell_size = cell_size
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+        self.order = np.empty(0, dtype=np.intp)
+        # The 3x3 neighbourhood as key offsets
+        dx, dy = np.mgrid[-1:2, -1:2]
+        self.neighbour_offsets = (dx * self.KEY_STRIDE + dy).ravel()
+
+    def _keys(self, points):
+        cells = np.floor(points / self.cell_size).astype(np.int64) + self.KEY_OFFSET
+        return cells[:, 0] * self.KEY_STRIDE + cells[:, 1]
+
+    def build(self, points):
+        """Bucket the points by sorting them on their cell key."""
+        keys = self._keys(points)
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.order]
+
+    def candidate_pairs(self, queries):
+        """
+        Find every indexed point in the 3x3 buckets around each query.
+        :return: Tuple of (query indices, point indices).
+        """
+        keys = (self._keys(queries)[:, None] + self.neighbour_offsets).ravel()
+        lo = np.searchsorted(self.sorted_keys, keys, side='left')
+        hi = np.searchsorted(self.sorted_keys, keys, side='right')
+        counts = hi - lo
+        total = counts.sum()
+
+        # Expand every [lo, hi) bucket range into individual pairs
+        query_index = np.repeat(np.arange(len(keys)) // len(self.neighbour_offsets), counts)
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        point_index = self.order[starts + np.arange(total)]
+        return query_index, point_index
+
+
+# Touch lifecycle states
+DEAD = 0  # Free slot
+TENTATIVE = 1  # Seen, but not yet confirmed; invisible downstream
+ACTIVE = 2  # Confirmed and currently detected
+COASTING = 3  # Confirmed but missing; held on its prediction until it dies
+
+
+class TrackTable:
+    def __init__(self, max_tracks=32):
+        """
+        Slot-based table of touches, updated in place every frame.
+        Row i of every array describes the touch in slot i; `active` marks the
+        confirmed touches, so downstream code iterates np.flatnonzero(table.active).
+        :param max_tracks: Number of slots.
+        """
+        self.max_tracks = max_tracks
+        self.id = np.full(max_tracks, -1, dtype=np.int64)  # -1 = free slot
+        self.x = np.zeros(max_tracks)  # Reported position (image pixels)
+        self.y = np.zeros(max_tracks)
+        self.size = np.zeros(max_tracks)
+        self.pressure = np.zeros(max_tracks)
+        self.state = np.zeros(max_tracks, dtype=np.int8)  # Lifecycle state
+        self.note = np.full(max_tracks, -1, dtype=np.int16)  # Sounding MIDI note, set by the MIDI stage
+        self.active = np.zeros(max_tracks, dtype=bool)  # Active or coasting
+        self.features = np.zeros(max_tracks, dtype=BLOB_DTYPE)  # Latest feature record
+
+
+class PersistentBlobTracker:
+    # adjust distance_threshold as needed by testing with interface; maybe use cell_width and cell_height or cell_width/2?
+    def __init__(self, distance_threshold=85, matching="hungarian", max_tracks=32,
+                 alpha=0.8, beta=0.5, lead_ms=0, spatial_hash_min_tracks=64,
+                 confirm_frames=2, confirm_ms=0, coast_frames=2, coast_ms=0,
+                 tentative_miss_frames=0, tentative_miss_ms=0, history_len=16):
+        """
+        Keep persistent IDs for blobs across frames.
+        Each track runs a constant-velocity alpha-beta filter and a
+        tentative -> active -> coasting -> dead lifecycle; all state lives in
+        fixed-size arrays indexed by track slot.
+        :param distance_threshold: Max distance (pixels) for matching a blob to a track.
+        :param matching: "hungarian" for optimal assignment or "greedy" for gated greedy.
+        :param max_tracks: Number of track slots.
+        :param alpha: Position correction gain (1 = trust the detection fully).
+        :param beta: Velocity correction gain.
+        :param lead_ms: Report positions this far ahead to hide sensor and processing latency.
+        :param spatial_hash_min_tracks: From this many live tracks on, only compare
+                                        detections with tracks in neighbouring hash cells.
+                                        Above the default max_tracks on purpose: one sensor
+                                        never needs it, larger surfaces raise max_tracks.
+        :param confirm_frames: Detections needed before a tentative track becomes active.
+        :param confirm_ms: Minimum age (ms) before a tentative track becomes active.
+        :param coast_frames: Missed frames a confirmed track survives before it dies.
+        :param coast_ms: Minimum time (ms) a confirmed track coasts before it dies.
+        :param tentative_miss_frames: Missed frames a tentative track survives before it dies
+                                      (0: a blob seen once and then lost is dropped at once).
+        :param tentative_miss_ms: Minimum time (ms) a missing tentative track is kept.
+        :param history_len: Samples kept per track for kinematics (see TrackHistory).
+        """
+        self.distance_threshold = distance_threshold  # Max distance for matching blobs
+        self.matching = matching
+        self.next_id = 0  # Counter for generating new IDs
+        self.freed_ids = []  # Min-heap of IDs from disappeared blobs for reuse
+
+        self.alpha = alpha
+        self.beta = beta
+        self.lead_ms = lead_ms
+        self.spatial_hash_min_tracks = spatial_hash_min_tracks
+        self.spatial_hash = SpatialHashIndex(distance_threshold)
+        self.confirm_frames = confirm_frames
+        self.confirm_ms = confirm_ms
+        self.coast_frames = coast_frames
+        self.coast_ms = coast_ms
+        self.tentative_miss_frames = tentative_miss_frames
+        self.tentative_miss_ms = tentative_miss_ms
+
+        # Track state as struct-of-arrays, one row per slot; the table is what downstream reads
+        self.max_tracks = max_tracks
+        self.table = TrackTable(max_tracks)
+        self.track_ids = self.table.id
+        self.state = self.table.state
+        self.features = self.table.features
+        self.position = np.zeros((max_tracks, 2))
+        self.velocity = np.zeros((max_tracks, 2))  # Pixels per second
+        self.last_time = np.zeros(max_tracks)  # Time of the last filter step
+        self.seen_time = np.zeros(max_tracks)  # Time of the last detection
+        self.birth_time = np.zeros(max_tracks)
+        self.hits = np.zeros(max_tracks, dtype=np.int32)
+        self.missed = np.zeros(max_tracks, dtype=np.int32)
+        self.history = TrackHistory(max_tracks, history_len)
+        self.time = None
+
+        # Blobs that found no free slot because the table was full
+        self.dropped_detections = 0
+
+        # IDs whose confirmed state changed in the last update
+        self.confirmed_ids = np.empty(0, dtype=np.int64)
+        self.released_ids = np.empty(0, dtype=np.int64)
+
+    def update_blobs(self, blobs, timestamp=None):
+        """
+        Update blob IDs by optimally matching this frame's blobs to the predicted tracks.
+        Only confirmed tracks (active or coasting) are marked active in the table.
+        :param blobs: Feature array from BlobFeatureExtractor.
+        :param timestamp: Frame time in seconds (defaults to now).
+        :return: The TrackTable, updated in place.
+        """
+        now = time.perf_counter() if timestamp is None else timestamp
+        self.time = now
+        live = np.flatnonzero(self.state != DEAD)
+
+        # Predict every live track to this frame's time
+        dt = np.maximum(now - self.last_time[live], 1e-6)
+        predicted = self.position[live] + self.velocity[live] * dt[:, None]
+
+        xy = np.empty((len(blobs), 2))
+        xy[:, 0] = blobs['x']
+        xy[:, 1] = blobs['y']
+        rows, cols = self.match(xy, predicted)
+
+        # Matched tracks: correct the prediction with the measurement
+        slots = live[cols]
+        residual = xy[rows] - predicted[cols]
+        self.position[slots] = predicted[cols] + self.alpha * residual
+        self.velocity[slots] += self.beta * residual / dt[cols, None]
+        self.last_time[slots] = now
+        self.seen_time[slots] = now
+        self.hits[slots] += 1
+        self.missed[slots] = 0
+        self.features[slots] = blobs[rows]
+        self.history.record(slots, self.position[slots], blobs['pressure'][rows], now)
+
+        # Unmatched tracks advance on their prediction
+        unmatched = np.ones(len(live), dtype=bool)
+        unmatched[cols] = False
+        lost = live[unmatched]
+        self.position[lost] = predicted[unmatched]
+        self.last_time[lost] = now
+        self.missed[lost] += 1
+
+        # Lifecycle transitions, evaluated for all slots at once
+        state = self.state
+        was_confirmed = (state == ACTIVE) | (state == COASTING)
+        detected = np.zeros(self.max_tracks, dtype=bool)
+        detected[slots] = True
+        age_ms = (now - self.birth_time) * 1000
+        absent_ms = (now - self.seen_time) * 1000
+
+        confirm = (state == TENTATIVE) & detected & \
+            (self.hits >= self.confirm_frames) & (age_ms >= self.confirm_ms)
+        die = ((state == TENTATIVE) & ~detected & (self.missed > self.tentative_miss_frames) &
+               (absent_ms >= self.tentative_miss_ms)) | \
+            (was_confirmed & ~detected & (self.missed > self.coast_frames) &
+             (absent_ms >= self.coast_ms))
+
+        state[confirm] = ACTIVE
+        state[(state == COASTING) & detected] = ACTIVE
+        state[(state == ACTIVE) & ~detected] = COASTING
+        state[die] = DEAD
+        dead = np.flatnonzero(die)
+
+        # Unmatched blobs start tentative tracks in free slots
+        new_rows = np.setdiff1d(np.arange(len(blobs)), rows)
+        free = np.flatnonzero((state == DEAD) & ~die)[:len(new_rows)]
+        self.dropped_detections += len(new_rows) - len(free)
+        new_rows = new_rows[:len(free)]
+        for slot in free:
+            self.track_ids[slot] = self._get_new_id()
+        self.position[free] = xy[new_rows]
+        self.velocity[free] = 0
+        self.last_time[free] = now
+        self.seen_time[free] = now
+        self.birth_time[free] = now
+        self.hits[free] = 1
+        self.missed[free] = 0
+        self.features[free] = blobs[new_rows]
+        self.history.reset(free)
+        self.history.record(free, xy[new_rows], blobs['pressure'][new_rows], now)
+        self.history.update_kinematics()
+        state[free] = TENTATIVE
+
+        # A single-frame confirmation requirement makes new tracks active immediately
+        instant = free[(self.hits[free] >= self.confirm_frames) & (self.confirm_ms <= 0)]
+        state[instant] = ACTIVE
+
+        # Downstream only hears about confirmed births and deaths
+        self.confirmed_ids = np.concatenate(
+            (self.track_ids[confirm], self.track_ids[instant]))
+        self.released_ids = self.track_ids[dead[was_confirmed[dead]]]
+
+        # Collect IDs of tracks that died in this frame to free up those IDs
+        for blob_id in self.track_ids[dead].tolist():
+            heapq.heappush(self.freed_ids, blob_id)
+        self.track_ids[dead] = -1
+
+        # Publish every slot, optionally projected ahead of the measurement
+        table = self.table
+        np.logical_or(state == ACTIVE, state == COASTING, out=table.active)
+        lead = self.lead_ms / 1000
+        np.multiply(self.velocity[:, 0], lead, out=table.x)
+        np.add(table.x, self.position[:, 0], out=table.x)
+        np.multiply(self.velocity[:, 1], lead, out=table.y)
+        np.add(table.y, self.position[:, 1], out=table.y)
+        np.copyto(table.size, self.features['size'])
+        np.copyto(table.pressure, self.features['pressure'])
+
+        return table
+
+    def metrics(self):
+        return {"live_tracks": int(np.count_nonzero(self.state != DEAD)),
+                "max_tracks": self.max_tracks,
+                "dropped_detections": self.dropped_detections}
+
+    def predict(self, lead_ms):
+        """Return every slot's position projected lead_ms ahead of the last update."""
+        return self.position + self.velocity * (lead_ms / 1000)
+
+    def match(self, detections, tracks):
+        """
+        Match detections to tracks with one broadcast distance matrix, or through the
+        spatial hash once there are many tracks.
+        :param detections: (N, 2) array of detection positions.
+        :param tracks: (M, 2) array of track positions.
+        :return: Tuple of (detection indices, track indices); every index appears once.
+        """
+        if len(detections) == 0 or len(tracks) == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+
+        if len(tracks) >= self.spatial_hash_min_tracks:
+            return self.match_spatial(detections, tracks)
+
+        diff = detections[:, None, :] - tracks[None, :, :]
+        cost = np.hypot(diff[..., 0], diff[..., 1])
+        gated = cost < self.distance_threshold
+
+        if self.matching == "greedy":
+            return greedy_assignment(cost, self.distance_threshold)
+
+        # Fast path: if every detection's nearest track is different, that is already optimal
+        nearest = np.where(gated, cost, np.inf).argmin(axis=1)
+        has_match = gated[np.arange(len(detections)), nearest]
+        rows = np.flatnonzero(has_match)
+        cols = nearest[rows]
+        if len(np.unique(cols)) == len(cols):
+            return rows, cols
+
+        # Contested tracks: gated pairs cost more than any full set of valid pairs
+        big = self.distance_threshold * (min(cost.shape) + 1)
+        rows, cols = solve_assignment(np.where(gated, cost, big))
+        keep = gated[rows, cols]
+        return rows[keep], cols[keep]
+
+    def match_spatial(self, detections, tracks):
+        """Match detections only against tracks in their own and neighbouring hash cells."""
+        self.spatial_hash.cell_size = self.distance_threshold
+        self.spatial_hash.build(tracks)
+        rows, cols = self.spatial_hash.candidate_pairs(detections)
+        diff = detections[rows] - tracks[cols]
+        cost = np.hypot(diff[:, 0], diff[:, 1])
+        gated = cost < self.distance_threshold
+        rows, cols, cost = rows[gated], cols[gated], cost[gated]
+
+        if self.matching == "greedy":
+            return greedy_pairs(rows, cols, cost)
+        big = self.distance_threshold * (min(len(detections), len(tracks)) + 1)
+        return sparse_assignment(rows, cols, cost, big)
+
+    def _get_new_id(self):
+        """Get a new or recycled ID for a blob."""
+        if self.freed_ids:
+            # Reuse the lowest available ID from freed IDs
+            return heapq.heappop(self.freed_ids)
+        else:
+            # Assign the next new ID
+            self.next_id += 1
+            return self.next_id
+
+    def get_blob_color(self, blob_id):
+        """Get a persistent color for each blob ID."""
+        return colors[blob_id % len(colors)]
+
+
+# Define a set of predefined colors
+colors = [
+    (95, 89, 255),      # Coral Red (FF595F)
+    (57, 202, 255),     # Golden Yellow (FFCA39)
+    (39, 201, 138),     # Lime Green (8AC927)
+    (196, 130, 26),     # Azure Blue (1A82C4)
+    (147, 76, 106),     # Royal Purple (6A4C93)
+    (77, 146, 255),     # Peach Orange (FF924D)
+    (117, 166, 83),     # Forest Green (53A675)
+    (220, 218, 168),    # Pale Aqua (A8DADC)
+    (49, 202, 197),     # Chartreuse (C5CA31)
+    (172, 103, 66),     # Steel Blue (4267AC)
+    (121, 83, 181),     # Magenta Pink (B55379)
+    (145, 110, 140),    # Mauve (8C6E91)
+    (103, 139, 182),    # Taupe (B68B67)
+    (249, 237, 250),    # Blush Pink (FAEDF9)
+    (87, 53, 30),       # Deep Navy (1E3557)
+    (167, 184, 219)     # Sand Beige (DBB8A7)
+]
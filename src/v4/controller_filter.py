@@ -0,0 +1,110 @@
+import time
+from midi_sender import coalesce_key
+
+
+# Smallest change worth sending, per message type. 16 pitchwheel steps is about 2 cents
+# at a 12 semitone bend range; 7-bit controllers drop single-step jitter.
+DEFAULT_DEADBAND = {'pitchwheel': 16, 'control_change': 2, 'aftertouch': 2, 'polytouch': 2}
+
+
+def controller_value(msg):
+    return msg.pitch if msg.type == 'pitchwheel' else msg.value
+
+
+class ControllerFilter:
+    def __init__(self, output, deadband=None, min_interval_ms=10, max_rate=500, burst=16,
+                 rest_ms=40):
+        """
+        Thin out continuous controller streams (pitchwheel, CC, pressure) before they hit the wire.
+        Each channel/controller has its own deadband and minimum interval; a token bucket caps
+        the total controller rate. Suppressed values are kept, and once a controller has stopped
+        changing for rest_ms its final value is always sent, so a touch settles exactly where it
+        stopped. Note messages pass straight through. Same send() as a mido port.
+        :param output: Port-like object the surviving messages are sent to.
+        :param deadband: Dict of message type -> smallest change that is sent.
+        :param min_interval_ms: Shortest time between two values for the same controller.
+        :param max_rate: Controller messages per second across all channels.
+        :param burst: Messages the rate limit lets through back to back.
+        :param rest_ms: Time a value must hold before it is sent as the resting value.
+        """
+        self.output = output
+        self.deadband = dict(DEFAULT_DEADBAND if deadband is None else deadband)
+        self.min_interval = min_interval_ms / 1000
+        self.max_rate = max_rate
+        self.burst = burst
+        self.rest = rest_ms / 1000
+        self.tokens = float(burst)
+        self.token_time = time.perf_counter()
+
+        # Controller key -> [sent value, sent time, latest msg, latest value, time it last changed]
+        self.state = {}
+
+        self.received = 0  # Controller messages offered
+        self.passed = 0  # Controller messages sent, including resting values
+        self.suppressed = 0
+
+    @property
+    def closed(self):
+        return self.output.closed
+
+    def send(self, msg, force=False):
+        """
+        Send a message, or hold it back if it is a controller update too small or too soon.
+        :param force: Send a controller value regardless of deadband and rate limits.
+        """
+        key = coalesce_key(msg)
+        if key is None:
+            if msg.type == 'note_on' or msg.type == 'note_off':
+                self._forget_channel(msg.channel)
+            self.output.send(msg)
+            return
+
+        self.received += 1
+        now = time.perf_counter()
+        value = controller_value(msg)
+        entry = self.state.get(key)
+        if entry is None:
+            entry = self.state[key] = [None, -float('inf'), msg, value, now]
+        elif value != entry[3]:
+            entry[4] = now
+        entry[2], entry[3] = msg, value
+
+        if force or self._allowed(msg.type, entry, value, now):
+            self._emit(entry, now)
+        else:
+            self.suppressed += 1
+
+    def flush(self):
+        """Send resting values of controllers that stopped changing; call once per frame."""
+        now = time.perf_counter()
+        for entry in self.state.values():
+            if entry[3] != entry[0] and now - entry[4] >= self.rest \
+                    and now - entry[1] >= self.min_interval:
+                self._emit(entry, now)
+
+    def _allowed(self, msg_type, entry, value, now):
+        if entry[0] is not None and abs(value - entry[0]) < self.deadband.get(msg_type, 1):
+            return False
+        if now - entry[1] < self.min_interval:
+            return False
+        # Token bucket over all controllers
+        self.tokens = min(self.burst, self.tokens + (now - self.token_time) * self.max_rate)
+        self.token_time = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def _emit(self, entry, now):
+        self.output.send(entry[2])
+        entry[0], entry[1] = entry[3], now
+        self.passed += 1
+
+    def _forget_channel(self, channel):
+        """A note starts or ends: the next controller value on its channel is always sent."""
+        for key in [key for key in self.state if key[1] == channel]:
+            del self.state[key]
+
+    def metrics(self):
+        return {"received": self.received, "passed": self.passed, "suppressed": self.suppressed,
+                "reduction": self.received / self.passed if self.passed else 0.0}
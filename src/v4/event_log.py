@@ -0,0 +1,151 @@
+import atexit
+import itertools
+import sys
+import threading
+import time
+from logging import DEBUG, INFO, WARNING, getLevelName
+
+
+class EventLog:
+    def __init__(self, capacity=4096, stream=None, flush_interval=0.05, default_level=INFO,
+                 show_time=False):
+        """
+        Non-blocking replacement for print() in the frame loop.
+        log() stores the format string and its arguments in a preallocated ring of records;
+        formatting and the (possibly slow) terminal write happen on a background thread,
+        one write per batch. Each category has its own level and can be sampled (keep every
+        Nth record), so debug output can stay on while playing.
+        If the writer falls more than `capacity` records behind, the oldest are dropped.
+        :param capacity: Number of records in the ring.
+        :param stream: Where lines are written (default sys.stdout at write time).
+        :param flush_interval: Seconds between writes.
+        :param default_level: Level for categories without their own (logging constants).
+        :param show_time: Prefix lines with seconds since the log was created.
+        """
+        self.capacity = capacity
+        self.stream = stream
+        self.flush_interval = flush_interval
+        self.default_level = default_level
+        self.show_time = show_time
+        self.levels = {}  # Category -> minimum level
+        self.sampling = {}  # Category -> keep every Nth record
+        self.sample_counts = {}
+
+        # Record ring; seq marks a slot as complete for sequence number n
+        self.seq = [-1] * capacity
+        self.times = [0.0] * capacity
+        self.categories = [None] * capacity
+        self.record_levels = [0] * capacity
+        self.formats = [None] * capacity
+        self.args = [None] * capacity
+        self._counter = itertools.count()  # next() is atomic, so any thread may log
+        self.read = 0  # Next sequence number the writer expects
+        self.dropped = 0
+        self.start_time = time.perf_counter()
+
+        self._lock = threading.Lock()  # Serializes drains (writer thread vs flush())
+        self._wake = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="EventLog", daemon=True)
+        self._thread.start()
+
+    def set_level(self, category, level):
+        self.levels[category] = level
+
+    def set_sampling(self, category, every):
+        """Keep only every Nth record of a category (1 keeps all)."""
+        self.sampling[category] = every
+        self.sample_counts[category] = 0
+
+    def enabled(self, category, level=INFO):
+        """True if a record would be kept; lets callers skip building expensive arguments."""
+        return level >= self.levels.get(category, self.default_level)
+
+    def log(self, category, level, fmt, *args):
+        """
+        Queue one record; formatted later as fmt.format(*args).
+        :param category: Name used for verbosity and sampling (e.g. "note", "bend").
+        :param level: logging.DEBUG, INFO or WARNING.
+        """
+        if level < self.levels.get(category, self.default_level):
+            return
+        every = self.sampling.get(category)
+        if every is not None and every > 1:
+            count = self.sample_counts[category]
+            self.sample_counts[category] = count + 1
+            if count % every:
+                return
+
+        n = next(self._counter)
+        slot = n % self.capacity
+        self.times[slot] = time.perf_counter()
+        self.categories[slot] = category
+        self.record_levels[slot] = level
+        self.formats[slot] = fmt
+        self.args[slot] = args
+        self.seq[slot] = n  # Published last
+
+    def debug(self, category, fmt, *args):
+        self.log(category, DEBUG, fmt, *args)
+
+    def info(self, category, fmt, *args):
+        self.log(category, INFO, fmt, *args)
+
+    def warning(self, category, fmt, *args):
+        self.log(category, WARNING, fmt, *args)
+
+    def _run(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Format and write every completed record."""
+        with self._lock:
+            lines = []
+            while True:
+                slot = self.read % self.capacity
+                n = self.seq[slot]
+                if n < self.read:
+                    break  # Not written yet
+                if n > self.read:
+                    # Overwritten before it was read: skip to the oldest record still in the ring
+                    skip = n - self.capacity + 1 - self.read
+                    self.dropped += skip
+                    self.read += skip
+                    continue
+                lines.append(self._format(slot))
+                self.read += 1
+            if lines:
+                stream = self.stream or sys.stdout
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+
+    def _format(self, slot):
+        try:
+            message = self.formats[slot].format(*self.args[slot])
+        except Exception as e:
+            message = f"{self.formats[slot]!r} {self.args[slot]!r} (format failed: {e})"
+        category = self.categories[slot]
+        if self.record_levels[slot] >= WARNING:
+            category = f"{category} {getLevelName(self.record_levels[slot])}"
+        if self.show_time:
+            return f"{self.times[slot] - self.start_time:9.3f} [{category}] {message}"
+        return f"[{category}] {message}"
+
+    def metrics(self):
+        return {"written": self.read - self.dropped, "dropped": self.dropped}
+
+    def close(self):
+        """Write what is left and stop the writer thread."""
+        if self._running:
+            self._running = False
+            self._wake.set()
+            self._thread.join()
+        self.flush()
+
+
+# Shared log for the whole process; written out at interpreter exit
+event_log = EventLog()
+atexit.register(event_log.close)
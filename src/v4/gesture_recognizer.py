@@ -0,0 +1,172 @@
+import collections
+import time
+import numpy as np
+from blob_tracker import ACTIVE
+
+
+# name: gesture name; time: when the gesture completed (s); latency_ms: completion -> report;
+# ids: track IDs involved; value: gesture-specific amount (distance, ratio or angle)
+GestureEvent = collections.namedtuple(
+    'GestureEvent', ['name', 'time', 'latency_ms', 'ids', 'value'])
+
+
+class GestureRecognizer:
+    def __init__(self, max_tracks=32, tap_ms=250, hold_ms=600, double_tap_ms=500,
+                 move_px=25, swipe_px=150, pinch_ratio=0.3, rotate_deg=35):
+        """
+        Streaming gesture recognizer over the tracker's TrackTable.
+        Keeps a small state machine per slot and one for the current finger pair, so each
+        frame only updates running values instead of re-scanning history.
+        :param max_tracks: Slot count of the TrackTable.
+        :param tap_ms: Longest touch that still counts as a tap.
+        :param hold_ms: Time a touch must stay still to count as a hold.
+        :param double_tap_ms: Longest gap between the two taps of a double tap.
+        :param move_px: Movement below this is treated as staying still.
+        :param swipe_px: Distance a touch must travel to count as a swipe.
+        :param pinch_ratio: Relative change in finger distance for pinch/spread.
+        :param rotate_deg: Angle two fingers must turn for a rotate.
+        """
+        self.tap_ms = tap_ms
+        self.hold_ms = hold_ms
+        self.double_tap_ms = double_tap_ms
+        self.move_px = move_px
+        self.swipe_px = swipe_px
+        self.pinch_ratio = pinch_ratio
+        self.rotate_deg = rotate_deg
+
+        # Per-slot touch state
+        self.owner = np.full(max_tracks, -1, dtype=np.int64)  # Track ID being followed
+        self.start_xy = np.zeros((max_tracks, 2))
+        self.start_time = np.zeros(max_tracks)
+        self.seen_time = np.zeros(max_tracks)  # Last frame the touch was actually detected
+        self.last_xy = np.zeros((max_tracks, 2))
+        self.max_travel = np.zeros(max_tracks)
+        self.consumed = np.zeros(max_tracks, dtype=bool)  # Already part of a gesture
+
+        # Last tap, for double-tap detection
+        self.last_tap_time = -np.inf
+        self.last_tap_xy = np.zeros(2)
+
+        # Two-finger state
+        self.pair = None  # (slot_a, slot_b, id_a, id_b)
+        self.pair_distance = 0.0
+        self.pair_angle = 0.0
+
+        self.update_ms = 0.0  # CPU time of the last update
+
+    def update(self, tracks, timestamp):
+        """
+        Advance every state machine by one frame.
+        :param tracks: TrackTable from PersistentBlobTracker.update_blobs.
+        :param timestamp: Frame time in seconds (same clock as the tracker).
+        :return: List of GestureEvent completed or recognized this frame.
+        """
+        started = time.perf_counter()
+        events = []
+        xy = np.column_stack((tracks.x, tracks.y))
+
+        # Touches that ended (or whose slot was taken by another touch)
+        ended = (self.owner >= 0) & (~tracks.active | (tracks.id != self.owner))
+        for slot in np.flatnonzero(ended).tolist():
+            self._touch_ended(slot, timestamp, events)
+            self.owner[slot] = -1
+
+        # New touches start their state machine
+        new = tracks.active & (self.owner < 0)
+        self.owner[new] = tracks.id[new]
+        self.start_xy[new] = xy[new]
+        self.start_time[new] = timestamp
+        self.max_travel[new] = 0
+        self.consumed[new] = False
+
+        # Running values for live touches
+        live = self.owner >= 0
+        detected = live & (tracks.state == ACTIVE)
+        self.seen_time[detected] = timestamp
+        self.last_xy[detected] = xy[detected]
+        travel = np.hypot(*(xy - self.start_xy).T)
+        np.maximum(self.max_travel, np.where(live, travel, 0), out=self.max_travel)
+
+        # Hold: still for long enough
+        age_ms = (timestamp - self.start_time) * 1000
+        holding = live & ~self.consumed & (self.max_travel < self.move_px) & \
+            (age_ms >= self.hold_ms)
+        for slot in np.flatnonzero(holding).tolist():
+            self.consumed[slot] = True
+            done = self.start_time[slot] + self.hold_ms / 1000
+            events.append(self._event(
+                'hold', done, timestamp, [self.owner[slot]], age_ms[slot]))
+
+        self._update_pair(live, xy, timestamp, events)
+
+        self.update_ms = (time.perf_counter() - started) * 1000
+        return events
+
+    def _touch_ended(self, slot, timestamp, events):
+        """Classify a finished touch as tap, double tap or swipe."""
+        if self.consumed[slot]:
+            return
+        lifted = self.seen_time[slot]
+        duration_ms = (lifted - self.start_time[slot]) * 1000
+        blob_id = self.owner[slot]
+
+        if self.max_travel[slot] < self.move_px and duration_ms <= self.tap_ms:
+            gap_ms = (self.start_time[slot] - self.last_tap_time) * 1000
+            near = np.hypot(*(self.start_xy[slot] - self.last_tap_xy)) < self.swipe_px
+            if gap_ms <= self.double_tap_ms and near:
+                events.append(self._event('double_tap', lifted, timestamp, [blob_id], gap_ms))
+                self.last_tap_time = -np.inf
+            else:
+                events.append(self._event('tap', lifted, timestamp, [blob_id], duration_ms))
+                self.last_tap_time = lifted
+                self.last_tap_xy = self.start_xy[slot].copy()
+            return
+
+        dx, dy = self.last_xy[slot] - self.start_xy[slot]
+        distance = np.hypot(dx, dy)
+        if distance >= self.swipe_px:
+            if abs(dx) >= abs(dy):
+                name = 'swipe_right' if dx > 0 else 'swipe_left'
+            else:
+                # Image y grows downwards
+                name = 'swipe_down' if dy > 0 else 'swipe_up'
+            events.append(self._event(name, lifted, timestamp, [blob_id], distance))
+
+    def _update_pair(self, live, xy, timestamp, events):
+        """Pinch, spread and rotate while exactly two fingers are down."""
+        slots = np.flatnonzero(live)
+        if len(slots) != 2:
+            self.pair = None
+            return
+
+        a, b = slots.tolist()
+        dx, dy = xy[b] - xy[a]
+        distance = np.hypot(dx, dy)
+        angle = np.degrees(np.arctan2(dy, dx))
+        key = (a, b, self.owner[a], self.owner[b])
+        if self.pair != key:
+            # A new pair: remember where it started
+            self.pair = key
+            self.pair_distance = max(distance, 1e-6)
+            self.pair_angle = angle
+            return
+        if self.consumed[a] or self.consumed[b]:
+            return
+
+        ratio = distance / self.pair_distance
+        turn = (angle - self.pair_angle + 180) % 360 - 180
+        ids = [self.owner[a], self.owner[b]]
+        if ratio <= 1 - self.pinch_ratio:
+            name, value = 'pinch', ratio
+        elif ratio >= 1 + self.pinch_ratio:
+            name, value = 'spread', ratio
+        elif abs(turn) >= self.rotate_deg:
+            name, value = 'rotate', turn
+        else:
+            return
+        self.consumed[[a, b]] = True
+        events.append(self._event(name, timestamp, timestamp, ids, value))
+
+    def _event(self, name, done, timestamp, ids, value):
+        latency_ms = (timestamp - done) * 1000
+        return GestureEvent(name, float(done), float(latency_ms), [int(i) for i in ids], float(value))
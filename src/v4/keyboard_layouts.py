@@ -0,0 +1,96 @@
+import numpy as np
+
+
+# Isomorphic layouts on the rectangular sensor grid: semitones per step right and per row up.
+# Hexagonal layouts are laid out skewed, so "up" is the hex up-right direction and the
+# up-left neighbour is up - right.
+ISOMORPHIC = {
+    "Wicki-Hayden": (2, 7),  # Whole tones across, fifths up (fourths up-left)
+    "Harmonic Table": (4, 7),  # Major thirds across, fifths up (minor thirds up-left)
+    "Janko": (2, 1),  # Whole tones across, rows a semitone apart
+}
+
+
+class KeyboardLayout:
+    def __init__(self, name, notes=None, right=None, up=None, row_intervals=None,
+                 column_step=1, root=40):
+        """
+        Description of how grid cells map to MIDI notes, compiled to a table by MIDINoteGrid.
+        Give exactly one of:
+        - notes: explicit note map, top row first (-1 for a silent cell)
+        - right and up: isomorphic layout (semitones per column and per row)
+        - row_intervals: semitones between successive rows from the bottom (like strings),
+          with column_step semitones per column
+        :param root: Note of the bottom-left cell for generated layouts.
+        """
+        self.name = name
+        self.notes = None if notes is None else np.asarray(notes, dtype=np.int64)
+        self.right = right
+        self.up = up
+        self.row_intervals = row_intervals
+        self.column_step = column_step
+        self.root = root
+
+    def spec(self):
+        """Plain dict describing the layout (the format load_layout reads)."""
+        if self.notes is not None:
+            return {"name": self.name, "notes": self.notes.tolist()}
+        if self.row_intervals is not None:
+            return {"name": self.name, "row_intervals": list(self.row_intervals),
+                    "column_step": self.column_step, "root": self.root}
+        return {"name": self.name, "right": self.right, "up": self.up, "root": self.root}
+
+    def table(self, rows, columns, shift=0):
+        """
+        Note table for a grid of the given size, top row first.
+        :param shift: Transposition in semitones (silent cells stay -1).
+        :return: (rows, columns) int array.
+        """
+        if self.notes is not None:
+            # Explicit maps are cropped or padded with silent cells to fit the grid
+            table = np.full((rows, columns), -1, dtype=np.int64)
+            r, c = min(rows, self.notes.shape[0]), min(columns, self.notes.shape[1])
+            table[:r, :c] = self.notes[:r, :c]
+            return np.where(table >= 0, table + shift, -1)
+
+        if self.row_intervals is not None:
+            intervals = list(self.row_intervals)[:rows - 1]
+            intervals += [intervals[-1] if intervals else 5] * (rows - 1 - len(intervals))
+            row_roots = self.root + np.concatenate(([0], np.cumsum(intervals)))
+            column_offsets = np.arange(columns) * self.column_step
+        else:
+            row_roots = self.root + np.arange(rows) * self.up
+            column_offsets = np.arange(columns) * self.right
+
+        # Rows were built bottom-up; the grid lists the top row first
+        return (row_roots[::-1, None] + column_offsets[None, :] + shift).astype(np.int64)
+
+
+def isomorphic_layout(name, root=40):
+    """One of the ISOMORPHIC layouts."""
+    right, up = ISOMORPHIC[name]
+    return KeyboardLayout(name, right=right, up=up, root=root)
+
+
+def layout_from_spec(spec, default_name="Custom"):
+    """
+    Layout from a dict with name and one of notes (list of rows, top first),
+    right + up, or row_intervals (+ column_step); root is optional.
+    """
+    name = spec.get("name", default_name)
+    root = spec.get("root", 40)
+    if "notes" in spec:
+        return KeyboardLayout(name, notes=spec["notes"])
+    if "row_intervals" in spec:
+        return KeyboardLayout(name, row_intervals=spec["row_intervals"],
+                              column_step=spec.get("column_step", 1), root=root)
+    if "right" in spec and "up" in spec:
+        return KeyboardLayout(name, right=spec["right"], up=spec["up"], root=root)
+    raise ValueError(f"{name}: layout needs 'notes', 'row_intervals' or 'right' and 'up'")
+
+
+def load_layout(path):
+    """Load a layout from YAML (needs PyYAML), with the keys layout_from_spec takes."""
+    import yaml
+    with open(path) as f:
+        return layout_from_spec(yaml.safe_load(f), default_name=path)
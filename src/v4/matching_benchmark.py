@@ -0,0 +1,82 @@
+import argparse
+import time
+import numpy as np
+from blob_features import BLOB_DTYPE
+from blob_tracker import PersistentBlobTracker
+
+
+# One tile is a padded 840x450 sensor image; a player uses a handful of fingers on it
+TILE_SIZE = (840, 450)
+
+
+def tiled_touches(n_touches, touches_per_tile, rng):
+    """Scatter touches over enough side-by-side tiles to keep the density constant."""
+    n_tiles = int(np.ceil(n_touches / touches_per_tile))
+    tiles_x = int(np.ceil(np.sqrt(n_tiles)))
+    tile = rng.integers(0, n_tiles, n_touches)
+    origin = np.column_stack((tile % tiles_x, tile // tiles_x)) * TILE_SIZE
+    return origin + rng.random((n_touches, 2)) * TILE_SIZE
+
+
+def time_matching(tracker, detections, tracks, repeats):
+    """Average time of one tracker.match call in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        tracker.match(detections, tracks)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def time_update(n_touches, touches_per_tile, frames, rng, frame_ms=70.0, **tracker_args):
+    """
+    Average time of one full update_blobs frame (prediction, matching, filter, lifecycle)
+    with every touch moving a little each frame; max_tracks is sized to the touch count.
+    """
+    tracker = PersistentBlobTracker(max_tracks=n_touches, **tracker_args)
+    position = tiled_touches(n_touches, touches_per_tile, rng)
+    blobs = np.zeros(n_touches, dtype=BLOB_DTYPE)
+    blobs['pressure'] = 1000
+    elapsed = 0.0
+    for i in range(frames + 3):
+        position += rng.normal(0, 5, position.shape)
+        blobs['x'], blobs['y'] = position[:, 0], position[:, 1]
+        start = time.perf_counter()
+        tracker.update_blobs(blobs, timestamp=i * frame_ms / 1000)
+        if i >= 3:  # Tracks are confirmed after the first frames
+            elapsed += time.perf_counter() - start
+    return elapsed / frames * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Compare full-matrix and spatial-hash matching cost against touch count.")
+    parser.add_argument('--touches-per-tile', type=int, default=8)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--matching', default="hungarian", choices=["hungarian", "greedy"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dense = PersistentBlobTracker(matching=args.matching, spatial_hash_min_tracks=np.inf)
+    hashed = PersistentBlobTracker(matching=args.matching, spatial_hash_min_tracks=0)
+
+    print(f"{'touches':>8} {'full matrix ms':>15} {'spatial hash ms':>16} {'hash us/touch':>14}")
+    for n_touches in [10, 25, 50, 100, 200, 400, 800]:
+        tracks = tiled_touches(n_touches, args.touches_per_tile, rng)
+        # Next frame: every touch moved a little
+        detections = tracks + rng.normal(0, 5, tracks.shape)
+
+        dense_ms = time_matching(dense, detections, tracks, args.repeats)
+        hash_ms = time_matching(hashed, detections, tracks, args.repeats)
+        print(f"{n_touches:>8} {dense_ms:>15.3f} {hash_ms:>16.3f} "
+              f"{hash_ms * 1000 / n_touches:>14.2f}")
+
+    # Whole tracker frame, where the hash only takes over once max_tracks allows that many
+    # live tracks (the default spatial_hash_min_tracks is above the default max_tracks)
+    print(f"\n{'touches':>8} {'update full ms':>15} {'update hash ms':>16} {'default ms':>11}")
+    for n_touches in [100, 200, 400, 800]:
+        full_ms = time_update(n_touches, args.touches_per_tile, args.repeats, rng,
+                              matching=args.matching, spatial_hash_min_tracks=np.inf)
+        hash_ms = time_update(n_touches, args.touches_per_tile, args.repeats, rng,
+                              matching=args.matching, spatial_hash_min_tracks=0)
+        default_ms = time_update(n_touches, args.touches_per_tile, args.repeats, rng,
+                                 matching=args.matching)
+        print(f"{n_touches:>8} {full_ms:>15.3f} {hash_ms:>16.3f} {default_ms:>11.3f}")
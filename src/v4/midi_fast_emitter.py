@@ -0,0 +1,95 @@
+# Status nibbles of the channel voice messages the instrument sends
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+POLY_PRESSURE = 0xA0
+CONTROL_CHANGE = 0xB0
+CHANNEL_PRESSURE = 0xD0
+PITCH_BEND = 0xE0
+
+
+def open_rtmidi_output(port_name):
+    """
+    Open a python-rtmidi output by name, or create a virtual port with that name
+    where the backend supports it (ALSA, CoreMIDI).
+    """
+    import rtmidi
+    midi_out = rtmidi.MidiOut()
+    ports = midi_out.get_ports()
+    if port_name in ports:
+        midi_out.open_port(ports.index(port_name))
+    else:
+        midi_out.open_virtual_port(port_name)
+    return midi_out
+
+
+class FastMIDIEmitter:
+    def __init__(self, port_name="Python MIDI Out", midi_out=None):
+        """
+        Send channel messages as raw bytes straight to a python-rtmidi output, skipping
+        mido.Message construction, validation and the backend's message-to-bytes step.
+        Status bytes are built once per channel; each call sends one ready 3-byte list.
+        A standalone output for code that already has raw values (see midi_send_benchmark);
+        the converter pipeline builds mido messages and keeps using mido ports. send(msg)
+        only exists for debugging and gains nothing over a mido port.
+        :param port_name: rtmidi port to open (or create as a virtual port).
+        :param midi_out: Already open object with send_message(bytes), used instead of opening one.
+        """
+        self.port_name = port_name
+        self.midi_out = open_rtmidi_output(port_name) if midi_out is None else midi_out
+        self._send = self.midi_out.send_message
+        self.closed = False
+
+        # Cached status bytes, indexed by channel
+        self.note_on_status = [NOTE_ON | ch for ch in range(16)]
+        self.note_off_status = [NOTE_OFF | ch for ch in range(16)]
+        self.poly_pressure_status = [POLY_PRESSURE | ch for ch in range(16)]
+        self.cc_status = [CONTROL_CHANGE | ch for ch in range(16)]
+        self.pressure_status = [CHANNEL_PRESSURE | ch for ch in range(16)]
+        self.bend_status = [PITCH_BEND | ch for ch in range(16)]
+
+    def note_on(self, channel, note, velocity):
+        self._send([self.note_on_status[channel], note, velocity])
+
+    def note_off(self, channel, note, velocity=64):
+        self._send([self.note_off_status[channel], note, velocity])
+
+    def pitch_bend(self, channel, value):
+        """:param value: -8192 to 8191, as in mido."""
+        value += 8192
+        self._send([self.bend_status[channel], value & 0x7F, value >> 7])
+
+    def control_change(self, channel, control, value):
+        self._send([self.cc_status[channel], control, value])
+
+    def channel_pressure(self, channel, value):
+        self._send([self.pressure_status[channel], value])
+
+    def poly_pressure(self, channel, note, value):
+        self._send([self.poly_pressure_status[channel], note, value])
+
+    def send_raw(self, message):
+        """Send one preassembled message (list or bytes of status and data bytes)."""
+        self._send(message)
+
+    def send_batch(self, messages):
+        """
+        Send a batch of preassembled messages in one call.
+        rtmidi takes one message per send_message, so the batch is a tight loop over the
+        bound method rather than one call per message from the caller.
+        :param messages: Iterable of byte lists, or an (n, 3) uint8 array.
+        """
+        if hasattr(messages, 'tolist'):
+            messages = messages.tolist()  # numpy rows become plain int lists
+        send = self._send
+        for message in messages:
+            send(message)
+
+    def send(self, msg):
+        """mido-compatible send for the debugging path."""
+        self._send(msg.bytes())
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            if hasattr(self.midi_out, 'close_port'):
+                self.midi_out.close_port()
@@ -0,0 +1,217 @@
+import collections
+import os
+import struct
+import threading
+import time
+import numpy as np
+import mido
+from mido.midifiles.midifiles import encode_variable_int
+from event_log import event_log
+
+
+END_OF_TRACK = b'\x00\xff\x2f\x00'  # Delta 0, end_of_track meta message
+
+
+class MIDIFileRecorder:
+    def __init__(self, forward=None, capacity=262144, ticks_per_beat=960, tempo=500000,
+                 flush_interval=2.0):
+        """
+        Always-on capture of everything sent to the MIDI output, usable as a sink (see midi_sinks).
+        Every message is stamped and copied into a preallocated ring of raw bytes, so memory is
+        fixed and the caller pays only for the copy; files are written by a background thread.
+        start() streams the capture to a Standard MIDI File, appending new events every
+        flush_interval seconds (the file stays valid after every flush). save_last() writes
+        the newest minutes of the ring with mido.MidiFile, whether or not recording was started.
+        Only channel messages (up to 3 bytes) are captured.
+        :param forward: Sink or port that receives every message before it is captured.
+        :param capacity: Ring size in messages (262144 is about 10 minutes at 400 messages/s).
+        :param ticks_per_beat: File resolution.
+        :param tempo: Microseconds per beat written to the file (500000 = 120 BPM).
+        :param flush_interval: Seconds between appends to the file being recorded.
+        """
+        self.forward = forward
+        self.capacity = capacity
+        self.ticks_per_beat = ticks_per_beat
+        self.tempo = tempo
+        self.ticks_per_second = ticks_per_beat * 1e6 / tempo
+        self.flush_interval = flush_interval
+        self.closed = False
+
+        # Ring of captured messages; count only grows, slot = count % capacity
+        self.times = np.zeros(capacity)  # perf_counter time
+        self.data = np.zeros((capacity, 3), dtype=np.uint8)
+        self.lengths = np.zeros(capacity, dtype=np.uint8)
+        self.count = 0
+
+        # Streaming file state, used only by the writer thread
+        self.file = None
+        self.file_start = 0.0  # Capture time of tick 0
+        self.written = 0  # Ring count up to which events are in the file
+        self.last_tick = 0
+        self.track_bytes = 0  # MTrk length without the end-of-track event
+
+        self._recording = False
+        self.dropped = 0  # Events overwritten before they reached the file
+        self.saved_files = []
+
+        self.commands = collections.deque()
+        self._wake = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="MIDIFileRecorder", daemon=True)
+        self._thread.start()
+
+    @property
+    def recording(self):
+        return self._recording
+
+    def send(self, msg):
+        """Forward the message, then copy its bytes into the ring."""
+        if self.forward is not None:
+            self.forward.send(msg)
+        data = msg.bytes()
+        length = len(data)
+        if length > 3:
+            return
+        slot = self.count % self.capacity
+        self.times[slot] = time.perf_counter()
+        self.data[slot, :length] = data
+        self.lengths[slot] = length
+        self.count += 1  # Published last, so the writer never reads a half-written slot
+
+    def start(self, path):
+        """Stream every message from now on to a .mid file."""
+        self._recording = True
+        self.commands.append(('start', path, time.perf_counter(), self.count))
+        self._wake.set()
+
+    def stop(self):
+        """Write what is left and close the file being recorded."""
+        self._recording = False
+        self.commands.append(('stop',))
+        self._wake.set()
+
+    def save_last(self, path, minutes=5):
+        """Write the newest minutes of the capture to a .mid file."""
+        self.commands.append(('save', path, time.perf_counter() - minutes * 60, self.count))
+        self._wake.set()
+
+    def _run(self):
+        while self._running or self.commands:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            while self.commands:
+                command = self.commands.popleft()
+                if command[0] == 'start':
+                    self._open(*command[1:])
+                elif command[0] == 'stop':
+                    self._finish()
+                else:
+                    self._save(*command[1:])
+            if self.file is not None:
+                self._append(self.count)
+
+    def _ring_slice(self, start, end):
+        """Ring slots of capture counts [start, end), skipping anything already overwritten."""
+        first = max(start, end - self.capacity)
+        return np.arange(first, end) % self.capacity, first - start
+
+    def _open(self, path, start_time, start_count):
+        self._finish()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'wb')
+        self.path = path
+        self.file_start = start_time
+        self.written = start_count
+        self.last_tick = 0
+
+        # Format 0 header, then one track starting with the tempo
+        self.file.write(b'MThd' + struct.pack('>LHHH', 6, 0, 1, self.ticks_per_beat))
+        self.file.write(b'MTrk\x00\x00\x00\x00')
+        tempo = bytes(mido.MetaMessage('set_tempo', tempo=self.tempo).bytes())
+        self.track_bytes = 0
+        self._write_events(b'\x00' + tempo)
+        event_log.info("recorder", "MIDI recording to {}", path)
+
+    def _append(self, end):
+        """Append captured events up to ring count `end` to the open file."""
+        if end == self.written:
+            return
+        slots, dropped = self._ring_slice(self.written, end)
+        self.dropped += dropped
+        ticks = np.rint((self.times[slots] - self.file_start) * self.ticks_per_second).astype(np.int64)
+        ticks = np.maximum.accumulate(np.maximum(ticks, self.last_tick))
+        deltas = np.diff(ticks, prepend=self.last_tick)
+
+        chunk = bytearray()
+        for delta, slot in zip(deltas.tolist(), slots.tolist()):
+            chunk.extend(encode_variable_int(delta))
+            chunk += self.data[slot, :self.lengths[slot]].tobytes()
+        self.last_tick = int(ticks[-1])
+        self.written = end
+        self._write_events(chunk)
+
+    def _write_events(self, chunk):
+        """Write events over the previous end-of-track, re-terminate and patch the track length."""
+        self.file.seek(22 + self.track_bytes)  # 14-byte header + 8-byte MTrk chunk header
+        self.file.write(chunk)
+        self.file.write(END_OF_TRACK)
+        self.track_bytes += len(chunk)
+        self.file.seek(18)
+        self.file.write(struct.pack('>L', self.track_bytes + len(END_OF_TRACK)))
+        self.file.flush()
+
+    def _finish(self):
+        if self.file is None:
+            return
+        self._append(self.count)
+        self.file.close()
+        self.file = None
+        self.saved_files.append(self.path)
+        event_log.info("recorder", "MIDI recording saved to {}", self.path)
+
+    def _save(self, path, cutoff, end):
+        slots, _ = self._ring_slice(0, end)
+        slots = slots[self.times[slots] >= cutoff]
+        if len(slots) == 0:
+            event_log.info("recorder", "Nothing to save: no MIDI in the requested time")
+            return
+
+        midi_file = mido.MidiFile(type=0, ticks_per_beat=self.ticks_per_beat)
+        track = mido.MidiTrack()
+        midi_file.tracks.append(track)
+        track.append(mido.MetaMessage('set_tempo', tempo=self.tempo, time=0))
+        ticks = np.rint((self.times[slots] - self.times[slots[0]]) * self.ticks_per_second)
+        deltas = np.diff(np.maximum.accumulate(ticks.astype(np.int64)), prepend=0)
+        for delta, slot in zip(deltas.tolist(), slots.tolist()):
+            msg = mido.Message.from_bytes(self.data[slot, :self.lengths[slot]].tolist())
+            track.append(msg.copy(time=delta))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        midi_file.save(path)
+        self.saved_files.append(path)
+        event_log.info("recorder", "Saved {} MIDI events to {}", len(slots), path)
+
+    def metrics(self):
+        return {
+            "captured": self.count,
+            "buffered": min(self.count, self.capacity),
+            "dropped": self.dropped,
+            "recording": self.recording,
+            "saved_files": list(self.saved_files),
+        }
+
+    def close(self):
+        """Finish any recording, stop the writer thread and close the forward output."""
+        if self.closed:
+            return
+        self.closed = True
+        self.stop()
+        self._running = False
+        self._wake.set()
+        self._thread.join()
+        if self.forward is not None:
+            self.forward.close()
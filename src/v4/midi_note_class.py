@@ -1,4 +1,5 @@
 import mido
+from midi_port_pool import get_output_port
 
 
 class MIDINote:
@@ -12,8 +13,8 @@ class MIDINote:
         self.output_port = None
 
     def open_midi_port(self, port_name="Python MIDI Out"):
-        """Opens the MIDI output port to send messages."""
-        self.output_port = mido.open_output(port_name)
+        """Attaches the shared MIDI output port (opened once per name by the port pool)."""
+        self.output_port = get_output_port(port_name)
 
     def send_note_on(self):
         """Sends a Note On message."""
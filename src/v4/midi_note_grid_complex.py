@@ -1,4 +1,18 @@
 import cv2
+import numpy as np
+from keyboard_layouts import ISOMORPHIC, isomorphic_layout
+from scala_tuning import ScalaTuning
+
+
+# Everything a preset captures; compile() and the setters replace these rather than
+# mutating them, so a snapshot stays valid after the grid changes
+STATE_ATTRIBUTES = ("tuning", "octave_shift", "semitone_shift", "current_scale_index", "layouts",
+                    "layout_name", "microtuning", "compiled", "grid", "note_table", "cell_names",
+                    "bend_offsets")
+
+NOTE_NAMES = ['C ', 'C#', 'D ', 'D#', 'E ', 'F ', 'F#', 'G ', 'G#', 'A ', 'A#', 'B ']
+# Built once: name with octave for every MIDI note
+NOTE_NAME_TABLE = [f"{NOTE_NAMES[n % 12]}{n // 12 - 1}" for n in range(128)]
 
 
 class MIDINoteGrid:
@@ -12,7 +26,77 @@ class MIDINoteGrid:
         self.scale_modes = ["Major", "Minor",
                             "Minor Pentatonic", "Major Pentatonic", "Chromatic"]
         self.current_scale_index = None  # None means no scale mode is applied
-        self.grid = self.generate_grid()
+        # Layouts besides the guitar tuning (see keyboard_layouts); scales apply only to "Guitar"
+        self.layouts = {name: isomorphic_layout(name) for name in ISOMORPHIC}
+        self.layout_name = "Guitar"
+        self.microtuning = None  # ScalaTuning applied to every layout, None = 12-TET
+        self.compiled = {}  # Layout name -> (grid, note_table, cell_names, bend_offsets)
+        self.grid = None
+        self.note_table = None  # (rows, columns) int array of MIDI notes, -1 = silent cell
+        self.cell_names = None  # Note name per cell, same shape as grid
+        self.bend_offsets = None  # Semitones each cell's note is bent by (microtuning)
+        self.compile()
+
+    def compile(self):
+        """
+        Rebuild every layout's grid and lookup tables. Called only when tuning, transposition,
+        scale or the set of layouts change; every lookup reads the compiled tables.
+        """
+        shift = self.octave_shift * 12 + self.semitone_shift
+        rows = len(self.tuning)
+        compiled = {"Guitar": self._compile_table(self.generate_grid())}
+        for name, layout in self.layouts.items():
+            compiled[name] = self._compile_table(layout.table(rows, self.columns, shift))
+        self.compiled = compiled
+        self.set_layout(self.layout_name)
+
+    def _compile_table(self, grid):
+        note_table = np.array(grid, dtype=np.int64)
+        if self.microtuning is None:
+            bend_offsets = np.zeros(note_table.shape)
+        else:
+            # Layout notes are keys of the tuning: play the nearest note, bent to pitch
+            note_table, bend_offsets = self.microtuning.retune(note_table)
+        # Notes transposed past the MIDI range become silent cells
+        note_table[(note_table < 0) | (note_table > 127)] = -1
+        cell_names = [[self.midi_to_note_name(note) if note >= 0 else "" for note in row]
+                      for row in note_table.tolist()]
+        return note_table.tolist(), note_table, cell_names, bend_offsets
+
+    def set_layout(self, name):
+        """Switch to a compiled layout; only swaps references, so it is safe mid-performance."""
+        self.grid, self.note_table, self.cell_names, self.bend_offsets = self.compiled[name]
+        self.layout_name = name
+
+    def load_microtuning(self, scl_path, kbm_path=None):
+        """Retune every layout to a Scala scale (.scl) and optional keyboard mapping (.kbm)."""
+        self.microtuning = ScalaTuning(scl_path, kbm_path)
+        self.compile()
+
+    def clear_microtuning(self):
+        """Back to 12-TET."""
+        self.microtuning = None
+        self.compile()
+
+    def cycle_layout(self):
+        """Switch to the next layout and return its name."""
+        names = list(self.compiled)
+        self.set_layout(names[(names.index(self.layout_name) + 1) % len(names)])
+        return self.layout_name
+
+    def add_layout(self, layout):
+        """Add or replace a KeyboardLayout (e.g. from keyboard_layouts.load_layout)."""
+        self.layouts = {**self.layouts, layout.name: layout}
+        self.compile()
+
+    def snapshot(self):
+        """References to the compiled state (see STATE_ATTRIBUTES)."""
+        return {name: getattr(self, name) for name in STATE_ATTRIBUTES}
+
+    def restore(self, state):
+        """Switch to a snapshot; only assigns references, nothing is recompiled."""
+        for name, value in state.items():
+            setattr(self, name, value)
 
     def generate_grid(self):
         """Generates a 6x13 grid of MIDI notes based on the current tuning."""
@@ -45,33 +129,34 @@ class MIDINoteGrid:
 
     def midi_to_note_name(self, midi_number, include_octave=True):
         """Converts a MIDI note number to a note name."""
-        note_names = ['C ', 'C#', 'D ', 'D#', 'E ',
-                      'F ', 'F#', 'G ', 'G#', 'A ', 'A#', 'B ']
-        note = note_names[midi_number % 12]
-        if include_octave:
-            octave = (midi_number // 12) - 1
-            return f"{note}{octave}"
-        return note
+        if not include_octave:
+            return NOTE_NAMES[midi_number % 12]
+        if 0 <= midi_number < 128:
+            return NOTE_NAME_TABLE[midi_number]
+        # Transposed past the MIDI range
+        return f"{NOTE_NAMES[midi_number % 12]}{midi_number // 12 - 1}"
 
     def transpose_octave(self, direction):
         """Transposes all notes up or down by one octave."""
         self.octave_shift += 1 if direction == 'up' else -1
-        self.grid = self.generate_grid()
+        self.compile()
 
     def transpose_semitone(self, direction):
         """Transposes all notes up or down by one semitone."""
         self.semitone_shift += 1 if direction == 'up' else -1
-        self.grid = self.generate_grid()
+        self.compile()
 
     def set_drop_d_tuning(self):
         """Sets the tuning to drop D (D A D G B e)."""
         self.tuning = [38, 45, 50, 55, 59, 64]
-        self.grid = self.generate_grid()
+        self.layout_name = "Guitar"
+        self.compile()
 
     def set_perfect_fourths_tuning(self):
         """Sets the tuning to all perfect fourths (E A D G C F)."""
         self.tuning = [40, 45, 50, 55, 60, 65]
-        self.grid = self.generate_grid()
+        self.layout_name = "Guitar"
+        self.compile()
 
     def set_standard_tuning(self):
         """Resets to standard guitar tuning, ignoring all adjustments."""
@@ -79,7 +164,8 @@ class MIDINoteGrid:
         self.current_scale_index = None  # Clear scale mode
         self.octave_shift = 0
         self.semitone_shift = 0
-        self.grid = self.generate_grid()
+        self.layout_name = "Guitar"
+        self.compile()
 
     def cycle_scale_mode(self):
         """Cycles through available scale modes."""
@@ -88,7 +174,7 @@ class MIDINoteGrid:
         else:
             self.current_scale_index = (
                 self.current_scale_index + 1) % len(self.scale_modes)
-        self.grid = self.generate_grid()
+        self.compile()
 
     def tuning_name(self):
         """Returns the name of the current tuning and its note names without octave numbers."""
@@ -109,7 +195,9 @@ class MIDINoteGrid:
         scale_mode = self.scale_modes[self.current_scale_index] if self.current_scale_index is not None else "None"
         root_note = self.midi_to_note_name(
             self.tuning[0] + self.octave_shift * 12 + self.semitone_shift, include_octave=False)
-        return (f"\nTuning: {self.tuning_name()}\n"
+        microtuning = self.microtuning.name if self.microtuning is not None else "12-TET"
+        return (f"\nLayout: {self.layout_name}\tMicrotuning: {microtuning}\n"
+                f"Tuning: {self.tuning_name()}\n"
                 f"Octave: {self.octave_shift}\t"
                 f"Semitone: {self.semitone_shift}\n"
                 f"Scale: {scale_mode}\t"
@@ -118,16 +206,38 @@ class MIDINoteGrid:
     def get_note_at_position(self, row, col):
         """Returns the MIDI note at a specific row and column in the grid."""
         if 0 <= row < len(self.grid) and 0 <= col < self.columns:
-            return self.grid[row][col]
+            return int(self.note_table[row, col])
         else:
             raise IndexError("Row or column out of range")
 
+    def notes_at(self, rows, cols):
+        """
+        MIDI notes for many grid positions in one lookup.
+        :param rows: Int array of rows; positions with a negative row or column get -1.
+        :param cols: Int array of columns, same shape as rows.
+        :return: Int array of MIDI notes.
+        """
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        inside = (rows >= 0) & (cols >= 0)
+        return np.where(inside, self.note_table[np.where(inside, rows, 0),
+                                                np.where(inside, cols, 0)], -1)
+
+    def pitches_at(self, rows, cols):
+        """
+        Sounding pitch (note plus microtuning offset, in semitones) for many grid positions.
+        :return: Float array; NaN outside the grid and on silent cells.
+        """
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        inside = (rows >= 0) & (cols >= 0)
+        rows, cols = np.where(inside, rows, 0), np.where(inside, cols, 0)
+        notes = self.note_table[rows, cols]
+        return np.where(inside & (notes >= 0), notes + self.bend_offsets[rows, cols], np.nan)
+
     def __str__(self):
         """Returns a string representation of the note grid with note names for debugging."""
-        grid_str = "\n".join(
-            ["\t".join(self.midi_to_note_name(note) for note in row)
-             for row in self.grid]
-        )
+        grid_str = "\n".join("\t".join(row) for row in self.cell_names)
         return f"{self.current_state()}\n\n{grid_str}"
 
 
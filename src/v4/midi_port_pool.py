@@ -0,0 +1,46 @@
+import atexit
+import threading
+import mido
+
+
+# Process-wide pool of open output ports, keyed by port name
+_ports = {}
+_lock = threading.Lock()
+
+
+def get_output_port(port_name="Python MIDI Out"):
+    """
+    Return the shared output port for a name, opening it on first use.
+    Every note and message for the same name goes through the same backend port.
+    :param port_name: Name of the MIDI output port.
+    :return: Open mido output port.
+    """
+    port = _ports.get(port_name)
+    if port is None or port.closed:
+        with _lock:
+            port = _ports.get(port_name)
+            if port is None or port.closed:
+                port = mido.open_output(port_name)
+                _ports[port_name] = port
+    return port
+
+
+def close_port(port_name):
+    """Close one pooled port (a later get_output_port reopens it)."""
+    with _lock:
+        port = _ports.pop(port_name, None)
+    if port is not None and not port.closed:
+        port.close()
+
+
+def close_all_ports():
+    """Close every pooled port; registered to run at interpreter exit."""
+    with _lock:
+        ports = list(_ports.values())
+        _ports.clear()
+    for port in ports:
+        if not port.closed:
+            port.close()
+
+
+atexit.register(close_all_ports)
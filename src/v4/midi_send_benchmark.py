@@ -0,0 +1,73 @@
+import argparse
+import time
+import numpy as np
+import mido
+from midi_fast_emitter import FastMIDIEmitter, open_rtmidi_output
+
+
+class NullOutput:
+    """Stands in for an rtmidi output when no MIDI backend is available; discards bytes."""
+
+    def send_message(self, message):
+        pass
+
+
+def open_outputs(port_name):
+    """
+    Return (mido port, raw rtmidi output, description). Without a working rtmidi backend
+    both paths send to NullOutput, so only the Python-side cost is measured.
+    """
+    try:
+        midi_out = open_rtmidi_output(port_name)
+        mido_port = mido.open_output(port_name)
+        return mido_port, midi_out, f"rtmidi port '{port_name}'"
+    except Exception as error:
+        null = NullOutput()
+        # mido's rtmidi backend ends in send_message(msg.bytes()); do the same on the null output
+        mido_port = FastMIDIEmitter(midi_out=null)
+        return mido_port, null, f"null output (no MIDI backend: {error})"
+
+
+def rate(send, n):
+    """Messages per second for n calls of send(i)."""
+    start = time.perf_counter()
+    for i in range(n):
+        send(i)
+    return n / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Compare messages/sec of the mido path and the raw rtmidi fast path.")
+    parser.add_argument('--port', default="TacTile Benchmark")
+    parser.add_argument('--messages', type=int, default=200000)
+    args = parser.parse_args()
+
+    mido_port, midi_out, description = open_outputs(args.port)
+    emitter = FastMIDIEmitter(midi_out=midi_out)
+    print(f"Sending {args.messages} pitch bends to {description}")
+
+    bends = np.random.default_rng(0).integers(-8192, 8192, args.messages).tolist()
+    channels = [i % 16 for i in range(args.messages)]
+
+    results = {
+        "mido.Message + send": rate(lambda i: mido_port.send(mido.Message(
+            'pitchwheel', channel=channels[i], pitch=bends[i])), args.messages),
+        "fast emitter pitch_bend": rate(
+            lambda i: emitter.pitch_bend(channels[i], bends[i]), args.messages),
+    }
+
+    # Batch: assemble every message's bytes with numpy (timed too, as a frame would have
+    # to), then send them in one call
+    start = time.perf_counter()
+    values = np.asarray(bends) + 8192
+    batch = np.column_stack((0xE0 | np.asarray(channels), values & 0x7F, values >> 7))
+    emitter.send_batch(batch.astype(np.uint8))
+    results["fast emitter send_batch"] = args.messages / (time.perf_counter() - start)
+
+    baseline = results["mido.Message + send"]
+    for name, messages_per_sec in results.items():
+        print(f"{name:>26}: {messages_per_sec:12,.0f} msg/s  ({messages_per_sec / baseline:5.1f}x)")
+    if isinstance(midi_out, NullOutput):
+        print("Null output: these are Python-side costs only; a real backend adds its own "
+              "per-message cost to every path, so the ratios shrink on a live port.")
@@ -0,0 +1,130 @@
+import collections
+import threading
+import time
+from event_log import event_log
+from window_stats import window_stats
+
+
+# Controllers that only make sense as a sequence (bank select, data entry, NRPN/RPN select)
+SEQUENCED_CONTROLS = {0, 6, 32, 38, 96, 97, 98, 99, 100, 101}
+
+
+def coalesce_key(msg):
+    """
+    Key identifying the controller a message updates, or None if it must not be merged.
+    Pitchwheel, CC and pressure only matter for their newest value per channel (and
+    controller or note); everything else, including RPN/NRPN sequences, is sent as queued.
+    """
+    if msg.type == 'pitchwheel' or msg.type == 'aftertouch':
+        return msg.type, msg.channel
+    if msg.type == 'control_change' and msg.control not in SEQUENCED_CONTROLS:
+        return msg.type, msg.channel, msg.control
+    if msg.type == 'polytouch':
+        return msg.type, msg.channel, msg.note
+    return None
+
+
+class MIDISender:
+    def __init__(self, output_port, tick_ms=1.0, latency_window=256):
+        """
+        Send MIDI messages from a dedicated thread so a slow backend never stalls a frame.
+        The frame loop only appends timestamped messages to a deque (atomic in CPython, no lock)
+        and wakes the thread only when the queue was empty, so a backlog is drained in one go.
+        Each drain keeps only the newest pitchwheel/CC/pressure value per channel and
+        controller, and sends everything else in its original order. A message the port
+        rejects is logged and dropped; the thread keeps running.
+        Exposes the same send() as a mido port, so it can stand in for one.
+        :param output_port: Open mido output port (see midi_port_pool).
+        :param tick_ms: Longest time the thread sleeps when the queue is empty.
+        :param latency_window: Number of recent send latencies kept for the metrics.
+        """
+        self.output_port = output_port
+        self.tick = tick_ms / 1000
+        self.queue = collections.deque()
+        self._wake = threading.Event()
+        self._running = True
+
+        # Metrics, written only by the sender thread
+        self.sent = 0
+        self.coalesced = 0
+        self.drains = 0  # Non-empty drains; sent / drains is the batch size
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.latencies_ms = collections.deque(maxlen=latency_window)  # Enqueue -> sent
+
+        self._thread = threading.Thread(target=self._run, name="MIDISender", daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self):
+        return not self._running
+
+    def send(self, msg):
+        """Queue a message with its enqueue time; returns immediately."""
+        self.queue.append((time.perf_counter(), msg))
+        if len(self.queue) == 1:
+            # Queue was empty: the thread may be waiting. Otherwise the pending drain (or the
+            # next tick, if it started just before this append) picks the message up.
+            self._wake.set()
+
+    def _run(self):
+        while self._running or self.queue:
+            self._wake.wait(self.tick)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self):
+        """Send one tick's worth of queued messages."""
+        depth = len(self.queue)
+        if depth == 0:
+            return
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self.drains += 1
+
+        pending = {}  # Coalesce key -> (enqueue time, msg), ordered by newest arrival
+        for _ in range(depth):
+            queued, msg = self.queue.popleft()
+            key = coalesce_key(msg)
+            if key is None:
+                # Controller updates queued before a note message must reach the synth first
+                self._flush(pending)
+                self._send(queued, msg)
+            else:
+                if key in pending:
+                    self.coalesced += 1
+                    del pending[key]  # Keep order of the newest value
+                pending[key] = (queued, msg)
+        self._flush(pending)
+
+    def _flush(self, pending):
+        for queued, msg in pending.values():
+            self._send(queued, msg)
+        pending.clear()
+
+    def _send(self, queued, msg):
+        try:
+            self.output_port.send(msg)
+        except Exception as error:
+            self.errors += 1
+            event_log.warning("midi", "Send failed, message dropped: {} ({})", msg, error)
+            return
+        self.sent += 1
+        self.latencies_ms.append((time.perf_counter() - queued) * 1000)
+
+    def metrics(self):
+        """Snapshot of queue depth, message counts and send latency in milliseconds."""
+        return {
+            "queue_depth": len(self.queue),
+            "max_queue_depth": self.max_queue_depth,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "drains": self.drains,
+            "errors": self.errors,
+            **window_stats(self.latencies_ms, "latency_ms"),
+        }
+
+    def close(self):
+        """Send whatever is still queued, then stop the thread."""
+        self._running = False
+        self._wake.set()
+        self._thread.join()
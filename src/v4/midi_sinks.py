@@ -0,0 +1,110 @@
+import collections
+import time
+import mido
+from midi_port_pool import get_output_port, close_port
+
+
+# Every sink has the mido port surface the MIDI stage uses: send(msg), close() and closed.
+
+
+class PortSink:
+    def __init__(self, port_name):
+        """Real output port, shared through the port pool."""
+        self.port_name = port_name
+        self.port = get_output_port(port_name)
+
+    @property
+    def closed(self):
+        return self.port.closed
+
+    def send(self, msg):
+        self.port.send(msg)
+
+    def close(self):
+        close_port(self.port_name)
+
+
+class MemorySink:
+    def __init__(self, max_messages=None, forward=None):
+        """
+        In-memory recorder: keeps every message with the time it arrived, so tests and
+        benchmarks can run without any MIDI backend.
+        :param max_messages: Keep only the newest messages (None keeps everything).
+        :param forward: Optional sink that also receives every message (timestamps are
+                        taken after it has sent).
+        """
+        self.messages = collections.deque(maxlen=max_messages)  # (perf_counter time, msg)
+        self.forward = forward
+        self.closed = False
+
+    def send(self, msg):
+        if self.forward is not None:
+            self.forward.send(msg)
+        self.messages.append((time.perf_counter(), msg))
+
+    def clear(self):
+        self.messages.clear()
+
+    def close(self):
+        self.closed = True
+        if self.forward is not None:
+            self.forward.close()
+
+
+class VirtualSink:
+    def __init__(self, port_name="TacTile Virtual"):
+        """
+        Virtual output port other applications can connect to (rtmidi on ALSA or CoreMIDI).
+        Raises if the backend cannot create virtual ports; see virtual_ports_available().
+        """
+        self.port_name = port_name
+        self.port = mido.open_output(port_name, virtual=True)
+
+    @property
+    def closed(self):
+        return self.port.closed
+
+    def send(self, msg):
+        self.port.send(msg)
+
+    def close(self):
+        self.port.close()
+
+
+def virtual_ports_available():
+    """True when the mido backend can load and create virtual ports."""
+    try:
+        mido.get_output_names()
+    except Exception:
+        return False
+    return mido.backend.name.startswith('mido.backends.rtmidi')
+
+
+def open_sink(kind="auto", port_name="IAC Driver TacTile", max_messages=None):
+    """
+    Create a MIDI sink.
+    :param kind: "port", "memory", "virtual", or "auto" (the named port if it exists,
+                 else a virtual port, else memory).
+    :param port_name: Port to open for "port" and "virtual".
+    :param max_messages: Messages a memory sink keeps (None keeps everything).
+    """
+    if kind == "port":
+        return PortSink(port_name)
+    if kind == "memory":
+        return MemorySink(max_messages)
+    if kind == "virtual":
+        return VirtualSink(port_name)
+    if kind != "auto":
+        raise ValueError(f"Unknown MIDI sink: {kind}")
+
+    try:
+        if port_name in mido.get_output_names():
+            return PortSink(port_name)
+    except Exception:
+        return MemorySink(max_messages)  # No MIDI backend at all
+    if virtual_ports_available():
+        try:
+            return VirtualSink(port_name)
+        except Exception:
+            pass
+    return MemorySink(max_messages)
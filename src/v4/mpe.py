@@ -0,0 +1,87 @@
+import collections
+import mido
+
+
+# MPE lower zone: channel 0 (MIDI channel 1) is the master, members follow it
+MASTER_CHANNEL = 0
+SLIDE_CC = 74  # MPE "slide" (timbre) controller
+
+
+class MPEChannelAllocator:
+    def __init__(self, member_channels=15, master_channel=MASTER_CHANNEL):
+        """
+        Hand out MPE member channels, one per sounding note.
+        Free channels wait in a deque with the least recently released at the front, and
+        channels in use sit in an OrderedDict oldest first, so allocating, releasing and
+        stealing are all O(1).
+        :param member_channels: Number of member channels in the zone (1-15).
+        :param master_channel: Zone master channel; members are the channels after it.
+        """
+        self.master_channel = master_channel
+        self.members = [master_channel + 1 + i for i in range(member_channels)]
+        self.free = collections.deque(self.members)
+        self.in_use = collections.OrderedDict()  # Channel -> owner, oldest first
+
+    def allocate(self, owner):
+        """
+        Take the least recently used free channel.
+        When every channel is busy, the oldest note's channel is stolen.
+        :param owner: Whatever identifies the note (e.g. a track slot).
+        :return: Tuple of (channel, owner of the stolen note or None).
+        """
+        stolen = None
+        if self.free:
+            channel = self.free.popleft()
+        else:
+            channel, stolen = self.in_use.popitem(last=False)
+        self.in_use[channel] = owner
+        return channel, stolen
+
+    def release(self, channel):
+        """Return a channel to the back of the free queue."""
+        if self.in_use.pop(channel, None) is not None:
+            self.free.append(channel)
+
+    def reset(self):
+        self.free = collections.deque(self.members)
+        self.in_use.clear()
+
+
+def rpn_messages(channel, parameter, value):
+    """Set a registered parameter (coarse value) and close the RPN again."""
+    return [
+        mido.Message('control_change', channel=channel, control=101, value=parameter >> 7),
+        mido.Message('control_change', channel=channel, control=100, value=parameter & 0x7F),
+        mido.Message('control_change', channel=channel, control=6, value=value),
+        mido.Message('control_change', channel=channel, control=38, value=0),
+        # Null RPN so later data entry does not change the parameter by accident
+        mido.Message('control_change', channel=channel, control=101, value=127),
+        mido.Message('control_change', channel=channel, control=100, value=127),
+    ]
+
+
+def mpe_configuration_messages(allocator, pitch_bend_range=48):
+    """
+    MPE Configuration Message (RPN 6) for the allocator's zone, followed by the pitch bend
+    range (RPN 0) on every member channel. Pass an allocator with 0 members to turn MPE off.
+    :param allocator: MPEChannelAllocator describing the zone.
+    :param pitch_bend_range: Per-note bend range in semitones.
+    """
+    messages = rpn_messages(allocator.master_channel, 6, len(allocator.members))
+    for channel in allocator.members:
+        messages += rpn_messages(channel, 0, pitch_bend_range)
+    return messages
+
+
+def note_expression_messages(channel, pitch_bend, pressure, slide):
+    """
+    Per-note expression on a member channel: bend, channel pressure and slide (CC74).
+    :param pitch_bend: -8192 to 8191.
+    :param pressure: 0-127.
+    :param slide: 0-127.
+    """
+    return [
+        mido.Message('pitchwheel', channel=channel, pitch=pitch_bend),
+        mido.Message('aftertouch', channel=channel, value=pressure),
+        mido.Message('control_change', channel=channel, control=SLIDE_CC, value=slide),
+    ]
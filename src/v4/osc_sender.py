@@ -0,0 +1,156 @@
+import socket
+import struct
+import time
+import numpy as np
+from blob_tracker import DEAD
+
+
+# Seconds between the NTP epoch (1900) and the Unix epoch (1970)
+NTP_EPOCH_OFFSET = 2208988800
+
+BUNDLE_HEADER = b'#bundle\x00'
+TOUCH_ADDRESS = '/tactile/touch'
+TOUCH_TYPES = ',ifffi'  # id, x, y, pressure, state
+FRAME_ADDRESS = '/tactile/frame'
+FRAME_TYPES = ',ii'  # frame number, touch count
+
+TOUCH_ARGS = struct.Struct('>ifffi')
+FRAME_ARGS = struct.Struct('>ii')
+TIMETAG = struct.Struct('>II')
+SIZE = struct.Struct('>i')
+
+
+def osc_string(text):
+    """OSC string: ASCII, null terminated, padded to a multiple of 4 bytes."""
+    data = text.encode('ascii') + b'\x00'
+    return data + b'\x00' * (-len(data) % 4)
+
+
+def ntp_timetag(unix_time):
+    """Split a Unix time into the (seconds, fraction) halves of an OSC/NTP timetag."""
+    seconds = int(unix_time)
+    fraction = int((unix_time - seconds) * (1 << 32)) & 0xFFFFFFFF
+    return (seconds + NTP_EPOCH_OFFSET) & 0xFFFFFFFF, fraction
+
+
+class OSCSender:
+    def __init__(self, host="127.0.0.1", port=57120, max_tracks=32, padding_offset=30,
+                 image_size=(780, 390), pressure_range=(2e4, 6e5), delay_ms=0):
+        """
+        Send every frame's touches as one OSC bundle over UDP.
+        The bundle holds a /tactile/frame message and one /tactile/touch message per touch
+        (id, x, y, pressure, state); a touch that ended is sent once more with state 0.
+        Positions are 0-1 over the sensor area and pressure is 0-1, as 32-bit floats.
+        Message layouts are fixed, so address and type tags are written into a preallocated
+        buffer once and each frame only packs the arguments with struct.pack_into.
+        :param host: Receiver address (e.g. SuperCollider's sclang listens on 57120).
+        :param port: Receiver UDP port.
+        :param max_tracks: Slot count of the tracker's TrackTable.
+        :param padding_offset: Border around the sensor image (pixels).
+        :param image_size: (width, height) of the sensor area inside the padding.
+        :param pressure_range: Blob pressure integral mapped to 0 and 1.
+        :param delay_ms: Timetag this far in the future, so receivers can smooth out jitter.
+        """
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.padding_offset = padding_offset
+        self.image_size = image_size
+        self.pressure_range = pressure_range
+        self.delay = delay_ms / 1000
+
+        # Fixed message templates: size prefix, address, type tags, then the arguments
+        frame_head = osc_string(FRAME_ADDRESS) + osc_string(FRAME_TYPES)
+        touch_head = osc_string(TOUCH_ADDRESS) + osc_string(TOUCH_TYPES)
+        self.frame_size = len(frame_head) + FRAME_ARGS.size
+        self.touch_size = len(touch_head) + TOUCH_ARGS.size
+        self.frame_args_offset = len(BUNDLE_HEADER) + TIMETAG.size + SIZE.size + len(frame_head)
+        self.touches_offset = self.frame_args_offset + FRAME_ARGS.size
+        self.touch_stride = SIZE.size + self.touch_size
+
+        # A frame can report every slot twice: the touch that ended there and a new one
+        # reusing the slot (also after OSC was switched off and on, with sent_ids stale)
+        self.max_messages = 2 * max_tracks
+        self.buffer = bytearray(self.touches_offset + self.max_messages * self.touch_stride)
+        self.buffer[:len(BUNDLE_HEADER)] = BUNDLE_HEADER
+        start = self.frame_args_offset - len(frame_head) - SIZE.size
+        SIZE.pack_into(self.buffer, start, self.frame_size)
+        self.buffer[start + SIZE.size:self.frame_args_offset] = frame_head
+        self.touch_head = touch_head
+        self.view = memoryview(self.buffer)
+
+        self.sent_ids = np.full(max_tracks, -1, dtype=np.int64)  # ID last sent from each slot
+        self.frame = 0
+        self.packets = 0
+        self.bytes_sent = 0
+
+    def send_frame(self, tracks, unix_time=None):
+        """
+        Pack and send one bundle for the current TrackTable.
+        :param tracks: TrackTable from PersistentBlobTracker.update_blobs.
+        :param unix_time: Time the frame was captured (defaults to now).
+        :return: Number of bytes sent.
+        """
+        unix_time = time.time() if unix_time is None else unix_time
+        TIMETAG.pack_into(self.buffer, len(BUNDLE_HEADER), *ntp_timetag(unix_time + self.delay))
+
+        # Touches that ended since the last frame (sent once with state 0), then live touches
+        live = tracks.active
+        ended = (self.sent_ids >= 0) & (~live | (tracks.id != self.sent_ids))
+        ended_slots = np.flatnonzero(ended)
+        slots = np.concatenate((ended_slots, np.flatnonzero(live)))
+        n_ended = len(ended_slots)
+
+        # Scale all touches at once
+        width, height = self.image_size
+        xs = (tracks.x[slots] - self.padding_offset) / width
+        ys = (tracks.y[slots] - self.padding_offset) / height
+        low, high = self.pressure_range
+        pressures = np.clip((tracks.pressure[slots] - low) / (high - low), 0, 1)
+        ids = tracks.id[slots]
+        ids[:n_ended] = self.sent_ids[ended_slots]
+        states = tracks.state[slots].astype(np.int64)
+        states[:n_ended] = DEAD
+        pressures[:n_ended] = 0.0
+
+        offset = self.touches_offset
+        head_size = len(self.touch_head)
+        for blob_id, x, y, pressure, state in zip(
+                ids.tolist(), xs.tolist(), ys.tolist(), pressures.tolist(), states.tolist()):
+            SIZE.pack_into(self.buffer, offset, self.touch_size)
+            self.buffer[offset + SIZE.size:offset + SIZE.size + head_size] = self.touch_head
+            TOUCH_ARGS.pack_into(self.buffer, offset + SIZE.size + head_size,
+                                 blob_id, x, y, pressure, state)
+            offset += self.touch_stride
+        FRAME_ARGS.pack_into(self.buffer, self.frame_args_offset, self.frame, len(slots))
+
+        self.sent_ids[ended] = -1
+        self.sent_ids[live] = tracks.id[live]
+        self.frame += 1
+
+        sent = self.socket.sendto(self.view[:offset], self.address)
+        self.packets += 1
+        self.bytes_sent += sent
+        return sent
+
+    def close(self):
+        self.socket.close()
+
+
+if __name__ == '__main__':
+    # Self-check: a full table whose slots are all reused by new touches in the next frame
+    from blob_tracker import ACTIVE, TrackTable
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    tracks = TrackTable(4)
+    sender = OSCSender(*receiver.getsockname(), max_tracks=tracks.max_tracks)
+    tracks.active[:] = True
+    tracks.state[:] = ACTIVE
+    for ids in ([0, 1, 2, 3], [4, 5, 6, 7]):
+        tracks.id[:] = ids
+        sent = sender.send_frame(tracks)
+        packet = receiver.recv(65536)
+        touch_count = FRAME_ARGS.unpack_from(packet, sender.frame_args_offset)[1]
+        print(f"IDs {ids}: {touch_count} touch messages, {sent} bytes")
+    assert touch_count == 8, "ended and new touches must all be reported"
+    sender.close()
+    receiver.close()
@@ -0,0 +1,131 @@
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from sensor_image import generate_image, apply_threshold_and_invert, create_blob_detector
+from blob_features import BlobFeatureExtractor
+from blob_tracker import PersistentBlobTracker
+from blob_midi_converter import BlobToMIDIConverter
+from midi_note_grid_complex import MIDINoteGrid
+from midi_sinks import MemorySink, open_sink
+from velocity_estimator import VelocityEstimator, MODES
+from synthetic_touches import render_frame
+from tracker_benchmark import FRAME_MS, SCENARIOS, scenario_touches
+from event_log import event_log
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = np.asarray(values)
+    return {"mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)), "max": float(values.max())}
+
+
+def run_pipeline(frames, frame_ms, sink, mpe=False, padding_offset=30, velocity_mode="slope"):
+    """
+    Feed frames through image -> detector -> features -> tracker -> MIDI at the sensor's
+    frame rate, recording when each frame arrived.
+    :return: Tuple of (arrival times, per-frame processing ms, velocity estimator metrics).
+    """
+    detector = create_blob_detector()
+    extractor = BlobFeatureExtractor()
+    tracker = PersistentBlobTracker()
+    velocity = VelocityEstimator(tracker, mode=velocity_mode, frame_ms=frame_ms)
+    converter = BlobToMIDIConverter(MIDINoteGrid(), None, max_tracks=tracker.max_tracks,
+                                    mpe=mpe, sink=sink, padding_offset=padding_offset,
+                                    velocity_estimator=velocity)
+
+    arrivals, processing_ms = [], []
+    next_frame = time.perf_counter()
+    for frame in frames:
+        # Pace frames like the serial link; the MIDI sender thread drains in between
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+        arrival = time.perf_counter()
+        next_frame = arrival + frame_ms / 1000
+
+        _, padded_img = generate_image(frame, padding_offset)
+        thresholded_img = apply_threshold_and_invert(padded_img, 10, 255)
+        blobs = extractor.extract(
+            detector.detect(thresholded_img), thresholded_img, padded_img)
+        converter.process_blobs(tracker.update_blobs(blobs, timestamp=arrival))
+
+        arrivals.append(arrival)
+        processing_ms.append((time.perf_counter() - arrival) * 1000)
+    converter.close()
+    return np.array(arrivals), processing_ms, velocity.metrics()
+
+
+def message_latencies(arrivals, messages):
+    """
+    Frame-arrival-to-message latency: each message is charged to the newest frame that
+    arrived before it was sent.
+    :return: Dict of message type -> list of latencies in ms, plus "all".
+    """
+    latencies = {"all": []}
+    for sent, msg in messages:
+        frame = np.searchsorted(arrivals, sent, side='right') - 1
+        if frame < 0:
+            continue
+        latency = (sent - arrivals[frame]) * 1000
+        latencies["all"].append(latency)
+        latencies.setdefault(msg.type, []).append(latency)
+    return latencies
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Run the full sensor-to-MIDI pipeline headless on synthetic touches and "
+                    "measure frame-arrival-to-MIDI-message latency.")
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--frame-ms', type=float, default=FRAME_MS)
+    parser.add_argument('--scenarios', nargs='+', default=["chord_taps", "vibrato_pair"],
+                        choices=SCENARIOS)
+    parser.add_argument('--sink', default="memory", choices=["memory", "port", "virtual", "auto"],
+                        help="Where messages go; every sink is wrapped in a timestamping recorder")
+    parser.add_argument('--port', default="IAC Driver TacTile")
+    parser.add_argument('--mpe', action='store_true')
+    parser.add_argument('--velocity', default="slope", choices=MODES,
+                        help="Note-on velocity mode; slope holds note-ons up to 2 frames")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON file to write (default: stdout)")
+    args = parser.parse_args()
+    event_log.stream = sys.stderr  # Note events must not end up in the JSON report
+
+    results = []
+    for scenario in args.scenarios:
+        rng = np.random.default_rng([args.seed, SCENARIOS.index(scenario)])
+        truth = scenario_touches(scenario, args.frames)
+        # Firm presses saturate the cells under the finger (see tracker_benchmark)
+        rendered = truth * [1, 1, 1.5]
+        frames = [render_frame(rendered[i][~np.isnan(rendered[i, :, 0])], footprint=1.0, rng=rng)
+                  for i in range(args.frames)]
+
+        inner = None if args.sink == "memory" else open_sink(args.sink, args.port)
+        sink = MemorySink(forward=inner)
+        arrivals, processing_ms, velocity = run_pipeline(
+            frames, args.frame_ms, sink, mpe=args.mpe, velocity_mode=args.velocity)
+        latencies = message_latencies(arrivals, sink.messages)
+
+        # Messages sent before the first frame (MPE configuration) are not charged to any frame
+        result = {"scenario": scenario, "frames": args.frames, "messages": len(latencies["all"]),
+                  "sink": type(inner).__name__ if inner is not None else "MemorySink",
+                  "processing_ms": percentiles(processing_ms),
+                  # Note-on delay added by the velocity estimator, on top of latency_ms
+                  "velocity_hold_ms": velocity,
+                  "latency_ms": {name: percentiles(values) for name, values in latencies.items()}}
+        results.append(result)
+        note_on = result["latency_ms"].get("note_on")
+        print(f"{scenario:>14}: {result['messages']:5d} messages, processing "
+              f"{result['processing_ms']['mean']:6.2f} ms/frame, note-on latency "
+              f"p50 {note_on['p50'] if note_on else 0:6.2f} ms, "
+              f"p95 {note_on['p95'] if note_on else 0:6.2f} ms", file=sys.stderr)
+
+    report = {"settings": vars(args), "results": results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
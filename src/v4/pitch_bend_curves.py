@@ -0,0 +1,84 @@
+import numpy as np
+
+
+CURVES = ["power", "s_curve", "deadzone"]
+
+
+def curve_shape(kind, magnitude, exponent=7, deadzone=0.1):
+    """
+    Response of a curve for magnitudes 0-1 (the sign is applied by the caller).
+    power: magnitude ** exponent, subtle near the start and steep near the cell edge.
+    s_curve: smoothstep, gentle at both ends and steepest in the middle.
+    deadzone: flat inside the deadzone, linear after it.
+    """
+    if kind == "power":
+        return magnitude ** max(exponent, 0)
+    if kind == "s_curve":
+        return magnitude * magnitude * (3 - 2 * magnitude)
+    if kind == "deadzone":
+        return np.clip((magnitude - deadzone) / (1 - deadzone), 0, 1)
+    raise ValueError(f"Unknown pitch bend curve: {kind}")
+
+
+class PitchBendCurve:
+    def __init__(self, kind="power", exponent=7, deadzone=0.1, pitch_bend_range=12,
+                 vibrato_semitones=2, resolution=1024):
+        """
+        Lookup table for the pitch bend response, so bending a frame of touches is one
+        indexing operation instead of a power per touch.
+        The vibrato table covers in-cell movement (-1 to 1 cell widths) quantized to
+        `resolution` steps; whole-column moves bend by the interval to the new cell's note.
+        The table is rebuilt only when a setting actually changes.
+        :param kind: One of CURVES.
+        :param exponent: Power curve exponent (the "Pitch Curve" trackbar).
+        :param deadzone: Fraction of a cell with no bend for the deadzone curve.
+        :param pitch_bend_range: Synth pitch bend range in semitones.
+        :param vibrato_semitones: Bend at a full cell width of in-cell movement.
+        :param resolution: Steps in the vibrato table.
+        """
+        self.kind = kind
+        self.exponent = exponent
+        self.deadzone = deadzone
+        self.pitch_bend_range = pitch_bend_range
+        self.vibrato_semitones = vibrato_semitones
+        self.resolution = resolution
+        self.vibrato_table = None
+        self.build()
+
+    def build(self):
+        """Recompute the vibrato table from the current settings."""
+        per_semitone = 8192 // self.pitch_bend_range
+        distance = np.linspace(-1, 1, self.resolution)
+        shaped = np.sign(distance) * curve_shape(
+            self.kind, np.abs(distance), self.exponent, self.deadzone)
+        self.vibrato_table = np.clip(
+            (shaped * self.vibrato_semitones * per_semitone).astype(np.int64), -8192, 8191)
+
+    def configure(self, **settings):
+        """Change settings (kind, exponent, ...) and rebuild the tables if anything changed."""
+        changed = False
+        for name, value in settings.items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed = True
+        if changed:
+            self.build()
+        return changed
+
+    def cycle_kind(self):
+        self.configure(kind=CURVES[(CURVES.index(self.kind) + 1) % len(CURVES)])
+        return self.kind
+
+    def bend(self, distance, column_diff, semitones):
+        """
+        Pitch bend for every touch at once.
+        :param distance: In-cell movement since the note started, in cell widths (-1 to 1).
+        :param column_diff: Columns moved since the note started.
+        :param semitones: Interval from the note's start cell to the current cell (used
+                          where column_diff is not 0); clamped to the pitch bend range.
+        :return: Int array of pitch bend values (-8192 to 8191).
+        """
+        index = np.rint((np.clip(distance, -1, 1) + 1) * (self.resolution - 1) / 2)
+        vibrato = self.vibrato_table[index.astype(np.intp)]
+        slide = np.clip(np.rint(semitones * (8192 // self.pitch_bend_range)), -8192, 8191)
+        return np.where(column_diff == 0, vibrato, slide.astype(np.int64))
@@ -0,0 +1,109 @@
+import argparse
+import os
+import numpy as np
+from sensor_image import generate_image, apply_threshold_and_invert, create_blob_detector
+from blob_features import BlobFeatureExtractor
+from blob_tracker import PersistentBlobTracker
+from synthetic_touches import render_frame, vibrato_trajectory
+from tracker_benchmark import FRAME_MS
+
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'archive')
+RECORDINGS = ['recorded_frames.npy', 'recorded_frames.txt.npy']
+
+
+def run_tracker(frames, frame_ms, padding_offset=30, **tracker_args):
+    """
+    Run the detection pipeline and tracker over a sequence of frames.
+    :return: List of per-frame dicts {id: (measured xy, filtered xy, velocity)}.
+    """
+    detector = create_blob_detector()
+    extractor = BlobFeatureExtractor()
+    tracker = PersistentBlobTracker(**tracker_args)
+    history = []
+    for i, frame in enumerate(frames):
+        _, padded_img = generate_image(frame, padding_offset)
+        thresholded_img = apply_threshold_and_invert(padded_img, 10, 255)
+        blobs = extractor.extract(
+            detector.detect(thresholded_img), thresholded_img, padded_img)
+        tracker.update_blobs(blobs, timestamp=i * frame_ms / 1000)
+
+        state = {}
+        for slot in np.flatnonzero(tracker.track_ids >= 0):
+            if tracker.missed[slot]:
+                continue  # Only score frames with a real measurement
+            measured = np.array(
+                [tracker.features['x'][slot], tracker.features['y'][slot]], dtype=float)
+            state[int(tracker.track_ids[slot])] = (
+                measured, tracker.position[slot].copy(), tracker.velocity[slot].copy())
+        history.append(state)
+    return history
+
+
+def score_prediction(history, frame_ms, lead_frames):
+    """
+    Compare positions predicted lead_frames ahead against the later measurement.
+    The baseline is holding the last measured position (no prediction).
+    """
+    lead_ms = lead_frames * frame_ms
+    hold_err, pred_err, speeds = [], [], []
+    for i in range(len(history) - lead_frames):
+        later = history[i + lead_frames]
+        for blob_id, (measured, filtered, velocity) in history[i].items():
+            if blob_id not in later:
+                continue
+            target = later[blob_id][0]
+            predicted = filtered + velocity * lead_ms / 1000
+            hold_err.append(np.linalg.norm(target - measured))
+            pred_err.append(np.linalg.norm(target - predicted))
+            speeds.append(np.linalg.norm(target - measured) / lead_ms)
+
+    if not hold_err:
+        return None
+    hold, pred, speed = np.mean(hold_err), np.mean(pred_err), np.mean(speeds)
+    # Latency the prediction hides: error removed, expressed as time at the mean speed
+    gain_ms = (hold - pred) / speed if speed > 0 else 0.0
+    return {"lead_ms": lead_ms, "samples": len(hold_err), "hold_error_px": hold,
+            "predicted_error_px": pred, "latency_gain_ms": gain_ms}
+
+
+def print_scores(name, history, frame_ms, max_lead_frames):
+    print(f"\n{name}")
+    for lead_frames in range(1, max_lead_frames + 1):
+        score = score_prediction(history, frame_ms, lead_frames)
+        if score is None:
+            print(f"  lead {lead_frames * frame_ms:6.1f} ms: no tracks to score")
+            continue
+        print(f"  lead {score['lead_ms']:6.1f} ms: hold error {score['hold_error_px']:6.2f} px, "
+              f"predicted error {score['predicted_error_px']:6.2f} px, "
+              f"latency gain {score['latency_gain_ms']:6.1f} ms ({score['samples']} samples)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Measure tracker prediction error on the archived recordings.")
+    parser.add_argument('--frame-ms', type=float, default=FRAME_MS)
+    parser.add_argument('--max-lead-frames', type=int, default=2)
+    parser.add_argument('--alpha', type=float, default=0.8)
+    parser.add_argument('--beta', type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for name in RECORDINGS:
+        frames = np.load(os.path.join(ARCHIVE_DIR, name))
+
+        # The recording as captured
+        history = run_tracker(frames, args.frame_ms, alpha=args.alpha, beta=args.beta)
+        print_scores(f"{name}: as recorded", history, args.frame_ms, args.max_lead_frames)
+
+        # A fingertip pressed into the recorded frames: a plain slide, then slow and fast vibrato
+        scenarios = [("slide", 0.0, 0.0), ("slide + 1.5 Hz vibrato", 0.4, 1.5),
+                     ("slide + 3 Hz vibrato", 0.4, 3.0)]
+        for label, vibrato_cells, vibrato_hz in scenarios:
+            trajectory = vibrato_trajectory(
+                len(frames), args.frame_ms, vibrato_cells=vibrato_cells, vibrato_hz=vibrato_hz)
+            pressed = [render_frame([touch], background=frame, noise=0, rng=rng)
+                       for touch, frame in zip(trajectory, frames)]
+            history = run_tracker(pressed, args.frame_ms, alpha=args.alpha, beta=args.beta)
+            print_scores(f"{name}: synthetic {label}", history,
+                         args.frame_ms, args.max_lead_frames)
@@ -0,0 +1,157 @@
+import collections
+import copy
+import json
+import os
+import time
+from midi_note_grid_complex import MIDINoteGrid
+from keyboard_layouts import layout_from_spec
+from pitch_bend_curves import PitchBendCurve
+from event_log import event_log
+from window_stats import window_stats
+
+
+HANDOFFS = ["hold", "release"]
+
+
+class PresetBank:
+    def __init__(self, note_grid, converter=None, path="presets.json", handoff="hold",
+                 latency_window=256):
+        """
+        Numbered presets of layout, tuning, transposition, scale, microtuning and pitch bend
+        curve, saved to a JSON file. Every preset is compiled when it is stored or loaded,
+        so recalling one only swaps references to its tables. A preset that fails to compile
+        (e.g. a missing .scl file) is skipped and reported; it stays in the file.
+        recall() queues a preset and apply() switches to it, called once at the top of
+        the frame loop, so a frame never sees half of two presets.
+        Sounding notes on recall:
+        - "hold": they keep their note, channel, microtuning offset and the column pitches
+          they slide over until the touch ends; new touches play the new preset (the bend
+          curve applies at once).
+        - "release": they are stopped before the switch.
+        :param note_grid: The MIDINoteGrid to switch.
+        :param converter: Optional BlobToMIDIConverter whose bend curve is switched too.
+        :param path: Preset file; loaded now if it exists.
+        :param handoff: One of HANDOFFS.
+        :param latency_window: Number of recent recall times kept for the metrics.
+        """
+        self.note_grid = note_grid
+        self.converter = converter
+        self.path = path
+        self.handoff = handoff
+        self.presets = {}  # Slot -> settings (what is saved)
+        self.compiled = {}  # Slot -> (grid snapshot, PitchBendCurve or None)
+        self.failed = {}  # Slot -> why it could not be compiled
+        self.pending = None
+        self.current = None
+        self.recall_us = collections.deque(maxlen=latency_window)
+        if path and os.path.exists(path):
+            self.load()
+
+    def capture(self):
+        """Settings of the current grid and bend curve."""
+        grid = self.note_grid
+        settings = {
+            "layout": grid.layout_name,
+            "tuning": list(grid.tuning),
+            "octave_shift": grid.octave_shift,
+            "semitone_shift": grid.semitone_shift,
+            "scale_index": grid.current_scale_index,
+            "layouts": [layout.spec() for layout in grid.layouts.values()],
+            "microtuning": None if grid.microtuning is None else
+            [grid.microtuning.scl_path, grid.microtuning.kbm_path],
+        }
+        if self.converter is not None:
+            curve = self.converter.bend_curve
+            settings["bend_curve"] = {"kind": curve.kind, "exponent": curve.exponent,
+                                      "deadzone": curve.deadzone}
+        return settings
+
+    def compile(self, settings):
+        """Build a preset's tables on a scratch grid; nothing live is touched."""
+        grid = MIDINoteGrid()
+        grid.layouts = {spec["name"]: layout_from_spec(spec) for spec in settings["layouts"]}
+        grid.tuning = list(settings["tuning"])
+        grid.octave_shift = settings["octave_shift"]
+        grid.semitone_shift = settings["semitone_shift"]
+        grid.current_scale_index = settings["scale_index"]
+        grid.layout_name = settings["layout"] if settings["layout"] in grid.layouts else "Guitar"
+        if settings["microtuning"] is not None:
+            grid.load_microtuning(*settings["microtuning"])  # Compiles
+        else:
+            grid.compile()
+
+        curve = None
+        if self.converter is not None and "bend_curve" in settings:
+            curve = PitchBendCurve(pitch_bend_range=self.converter.pitch_bend_range,
+                                   **settings["bend_curve"])
+        return grid.snapshot(), curve
+
+    def store(self, slot):
+        """Save the current state as a preset and write the bank to disk."""
+        settings = self.capture()
+        self.presets[slot] = settings
+        self.compiled[slot] = self.compile(settings)
+        self.failed.pop(slot, None)
+        self.current = slot
+        self.save()
+
+    def recall(self, slot):
+        """Queue a preset for the next apply(); returns False if the slot is empty."""
+        if slot not in self.compiled:
+            return False
+        self.pending = slot
+        return True
+
+    def apply(self):
+        """
+        Switch to the queued preset, if any; call between frames.
+        :return: True if a preset was applied.
+        """
+        slot = self.pending
+        if slot is None:
+            return False
+        self.pending = None
+        if self.handoff == "release" and self.converter is not None:
+            self.converter.stop_all_notes()
+
+        start = time.perf_counter()
+        state, curve = self.compiled[slot]
+        self.note_grid.restore(state)
+        if curve is not None:
+            # Shallow copy: later curve changes rebuild the copy's tables, not the preset's
+            self.converter.bend_curve = copy.copy(curve)
+        self.recall_us.append((time.perf_counter() - start) * 1e6)
+        self.current = slot
+        return True
+
+    def save(self):
+        """Write the bank to its file (through a temporary file, so a crash never truncates it)."""
+        data = {"presets": {str(slot): settings for slot, settings in self.presets.items()}}
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def load(self):
+        """Read and compile every preset in the file, skipping those that fail."""
+        with open(self.path) as f:
+            data = json.load(f)
+        self.presets = {int(slot): settings for slot, settings in data["presets"].items()}
+        self.compiled = {}
+        self.failed = {}
+        for slot, settings in self.presets.items():
+            try:
+                self.compiled[slot] = self.compile(settings)
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                self.failed[slot] = f"{type(error).__name__}: {error}"
+                event_log.warning("preset", "Preset {} skipped: {}", slot, self.failed[slot])
+
+    def metrics(self):
+        """Time the recall swap took, in microseconds."""
+        return {
+            "presets": len(self.presets),
+            "failed": dict(self.failed),
+            "current": self.current,
+            "recalls": len(self.recall_us),
+            **window_stats(self.recall_us, "recall_us"),
+        }
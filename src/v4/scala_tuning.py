@@ -0,0 +1,129 @@
+import math
+import os
+import numpy as np
+
+
+def _lines(path):
+    """Non-comment lines of a Scala file."""
+    with open(path, encoding="latin-1") as f:
+        return [line.strip() for line in f if not line.lstrip().startswith('!')]
+
+
+def parse_pitch(text):
+    """Scala pitch value in cents: '701.955' (cents), '3/2' (ratio) or '2' (ratio)."""
+    value = text.split()[0]
+    if '.' in value:
+        return float(value)
+    if '/' in value:
+        numerator, denominator = value.split('/')
+        return 1200 * math.log2(int(numerator) / int(denominator))
+    return 1200 * math.log2(int(value))
+
+
+def parse_scl(path):
+    """
+    Read a Scala .scl scale.
+    :return: Tuple of (description, cents); cents lists degrees 1..n, the last one being the period.
+    """
+    lines = _lines(path)
+    description = lines[0]
+    count = int(lines[1].split()[0])
+    cents = [parse_pitch(line) for line in lines[2:2 + count]]
+    if len(cents) != count or count == 0:
+        raise ValueError(f"{path}: expected {count} pitches, found {len(cents)}")
+    return description, cents
+
+
+def parse_kbm(path):
+    """
+    Read a Scala .kbm keyboard mapping.
+    :return: Dict with map_size, first_note, last_note, middle_note, reference_note,
+             reference_freq, octave_degree and mapping (scale degree per key, None = unmapped).
+    """
+    lines = [line for line in _lines(path) if line]
+    map_size = int(lines[0].split()[0])
+    keymap = {
+        "map_size": map_size,
+        "first_note": int(lines[1].split()[0]),
+        "last_note": int(lines[2].split()[0]),
+        "middle_note": int(lines[3].split()[0]),
+        "reference_note": int(lines[4].split()[0]),
+        "reference_freq": float(lines[5].split()[0]),
+        "octave_degree": int(lines[6].split()[0]),
+    }
+    entries = [line.split()[0] for line in lines[7:7 + map_size]]
+    entries += ['x'] * (map_size - len(entries))  # Missing entries are unmapped
+    keymap["mapping"] = [None if entry == 'x' else int(entry) for entry in entries]
+    return keymap
+
+
+# Linear mapping without a .kbm: key 60 is degree 0 (1/1), tuned to 12-TET middle C
+DEFAULT_KEYMAP = {
+    "map_size": 0, "first_note": 0, "last_note": 127, "middle_note": 60,
+    "reference_note": 60, "reference_freq": 261.6255653, "octave_degree": 0, "mapping": [],
+}
+
+
+class ScalaTuning:
+    def __init__(self, scl_path, kbm_path=None):
+        """
+        Microtonal tuning from a Scala scale and optional keyboard mapping.
+        Each key (the note number a layout assigns to a cell) gets a fractional MIDI pitch,
+        so the MIDI stage can play the nearest 12-TET note plus a pitch bend offset.
+        :param scl_path: .scl file.
+        :param kbm_path: Optional .kbm file (default: linear mapping around middle C).
+        """
+        self.scl_path = scl_path
+        self.kbm_path = kbm_path
+        self.description, self.cents = parse_scl(scl_path)
+        self.name = os.path.splitext(os.path.basename(scl_path))[0]
+        self.keymap = parse_kbm(kbm_path) if kbm_path else dict(DEFAULT_KEYMAP)
+        self.pitch_table = self._build_pitch_table()
+
+    def degree_cents(self, degree):
+        """Cents above degree 0 for any (also negative) scale degree."""
+        n = len(self.cents)
+        octaves, index = divmod(degree, n)
+        return octaves * self.cents[-1] + (self.cents[index - 1] if index else 0.0)
+
+    def key_cents(self, key):
+        """Cents of a key above the middle note's degree 0, or None if the key is unmapped."""
+        keymap = self.keymap
+        if not keymap["first_note"] <= key <= keymap["last_note"]:
+            return None
+        offset = key - keymap["middle_note"]
+        if keymap["map_size"] == 0:
+            return self.degree_cents(offset)
+        octaves, index = divmod(offset, keymap["map_size"])
+        degree = keymap["mapping"][index]
+        if degree is None:
+            return None
+        octave_degree = keymap["octave_degree"] or len(self.cents)
+        return octaves * self.degree_cents(octave_degree) + self.degree_cents(degree)
+
+    def _build_pitch_table(self):
+        """Fractional MIDI pitch for each of the 128 keys (NaN where unmapped)."""
+        reference = self.key_cents(self.keymap["reference_note"])
+        if reference is None:
+            raise ValueError("The keyboard mapping leaves its reference note unmapped")
+        reference_pitch = 69 + 12 * math.log2(self.keymap["reference_freq"] / 440)
+        table = np.full(128, np.nan)
+        for key in range(128):
+            cents = self.key_cents(key)
+            if cents is not None:
+                table[key] = reference_pitch + (cents - reference) / 100
+        return table
+
+    def retune(self, keys):
+        """
+        Nearest MIDI note and bend offset for a table of keys, all at once.
+        :param keys: Int array of keys (-1 = silent cell).
+        :return: Tuple of (notes, offsets); notes are -1 where silent, unmapped or out of
+                 range, offsets are in semitones (-0.5 to 0.5).
+        """
+        valid = (keys >= 0) & (keys <= 127)
+        pitch = np.where(valid, self.pitch_table[np.clip(keys, 0, 127)], np.nan)
+        notes = np.rint(pitch)
+        playable = ~np.isnan(pitch) & (notes >= 0) & (notes <= 127)
+        offsets = np.where(playable, pitch - notes, 0.0)
+        return np.where(playable, notes, -1).astype(np.int64), offsets
@@ -4,6 +4,7 @@ import serial.tools.list_ports
 import random
 from midi_note_grid_complex import MIDINoteGrid
 from midi_note_class import MIDINote
+from event_log import event_log, DEBUG
 import time
 import mido
 
@@ -186,8 +187,8 @@ class BlobToMIDIConverter:
                         "initial_rel_x": initial_rel_x,  # Store initial position
                     }
 
-                    print(f"\nBlob {blob_id} started note {
-                          note_name} with velocity {velocity}")
+                    event_log.info("note", "Blob {} started note {} with velocity {}",
+                                   blob_id, note_name, velocity)
 
                 else:
                     # Apply pitch bend based on blob position
@@ -202,8 +203,8 @@ class BlobToMIDIConverter:
                             mido.Message(
                                 'pitchwheel', channel=0, pitch=pitch_bend)
                         )
-                        print(f"\nBlob {blob_id}: Applied Pitch Bend {
-                              pitch_bend}")
+                        event_log.debug("bend", "Blob {}: Applied Pitch Bend {}",
+                                        blob_id, pitch_bend)
 
         # Check for any blobs that have disappeared and stop their notes
         self._stop_disappeared_blobs(blob_positions)
@@ -230,24 +231,24 @@ class BlobToMIDIConverter:
 
             pitch_bend = int(curved_distance * 2 * pitch_bend_per_semitone)
 
-            print(f"Manual Vibrato: rel_x={rel_x:.2f}, initial_rel_x={initial_rel_x:.2f}, "
-                  f"distance={distance:.2f}, curved_distance={curved_distance:.2f}, pitch_bend={pitch_bend}")
+            event_log.debug("bend", "Manual Vibrato: rel_x={:.2f}, initial_rel_x={:.2f}, "
+                            "distance={:.2f}, curved_distance={:.2f}, pitch_bend={}",
+                            rel_x, initial_rel_x, distance, curved_distance, pitch_bend)
         else:
             # Note Bend: Calculate based on horizontal movement to a new block
             note_diff = col - start_col
             pitch_bend_per_semitone = 8192 // pitch_bend_range
             pitch_bend = note_diff * pitch_bend_per_semitone
 
-            print(f"Note Bend: col={col}, start_col={start_col}, note_diff={
-                note_diff}, pitch_bend={pitch_bend}")
+            event_log.debug("bend", "Note Bend: col={}, start_col={}, note_diff={}, pitch_bend={}",
+                            col, start_col, note_diff, pitch_bend)
 
         # Clamp the pitch bend value to the valid range
         pitch_bend = max(-8192, min(8191, pitch_bend))
 
         # Debugging output
-        print(f"Grid X: {grid_x}, Grid Y: {grid_y}")
-        print(f"Relative X: {rel_x:.2f}, Relative Y: {rel_y:.2f}")
-        print(f"Calculated Pitch Bend: {pitch_bend}")
+        event_log.debug("bend", "Grid X: {}, Grid Y: {}, Relative X: {:.2f}, Relative Y: {:.2f}, "
+                        "Calculated Pitch Bend: {}", grid_x, grid_y, rel_x, rel_y, pitch_bend)
 
         return pitch_bend
 
@@ -283,7 +284,7 @@ class BlobToMIDIConverter:
             if note.output_port:
                 note.output_port.send(mido.Message(
                     'note_off', channel=note.midi_channel, note=note.midi_note))
-                print(f"Blob {blob_id} stopped note {note_name}")
+                event_log.info("note", "Blob {} stopped note {}", blob_id, note_name)
 
             # Clear the note grid block color here (customize as needed)
 
@@ -319,7 +320,7 @@ class BlobToMIDIConverter:
                     'note_off', channel=note.midi_channel, note=note.midi_note))
             # Remove the note from active notes after stopping it
             self.active_notes.pop(blob_id)
-        print("\n\nAll active notes stopped.")
+        event_log.info("note", "All active notes stopped.")
 
 
 def map_value(value, in_min=0, in_max=1023, out_min=0, out_max=255):
@@ -533,6 +534,10 @@ if __name__ == '__main__':
     midi_port_name = "IAC Driver TacTile"  # Adjust this as needed
     midi_converter = BlobToMIDIConverter(note_grid, midi_port_name)
 
+    # Pitch bend debugging stays on, thinned to every 10th record
+    event_log.set_level("bend", DEBUG)
+    event_log.set_sampling("bend", 10)
+
     while True:
 
         # Read current trackbar positions for threshold and area parameters
@@ -2,10 +2,23 @@ import numpy as np
 import cv2
 import serial.tools.list_ports
 import random
+import glob
+import os
 from midi_note_grid_complex import MIDINoteGrid
-from midi_note_class import MIDINote
+from keyboard_layouts import load_layout
+from preset_bank import PresetBank
+from midi_port_pool import close_all_ports
+from midi_sinks import open_sink
+from midi_file_recorder import MIDIFileRecorder
+from blob_midi_converter import BlobToMIDIConverter
+from velocity_estimator import VelocityEstimator
+from blob_features import BlobFeatureExtractor
+from blob_tracker import PersistentBlobTracker
+from sensor_image import generate_image, apply_threshold_and_invert
+from gesture_recognizer import GestureRecognizer
+from osc_sender import OSCSender
+from event_log import event_log
 import time
-import mido
 
 
 class DummyDataGenerator:
@@ -75,289 +88,6 @@ class AdvancedDummyDataGenerator:
         return self.current_frame
 
 
-class PersistentBlobTracker:
-    # adjust distance_threshold as needed by testing with interface; maybe use cell_width and cell_height or cell_width/2?
-    def __init__(self, distance_threshold=85):
-        self.blob_positions = {}  # Store blob positions by ID
-        self.distance_threshold = distance_threshold  # Max distance for matching blobs
-        self.next_id = 0  # Counter for generating new IDs
-        self.freed_ids = []  # Store IDs from disappeared blobs for reuse
-
-    def update_blobs(self, keypoints):
-        """Update blob IDs based on proximity matching."""
-        new_positions = {}
-
-        for keypoint in keypoints:
-            x, y = int(keypoint.pt[0]), int(keypoint.pt[1])
-            size = int(keypoint.size)
-            position = (x, y)
-
-            # Find closest existing blob within the distance threshold
-            closest_id, min_distance = None, float('inf')
-            for blob_id, (prev_position, _) in self.blob_positions.items():
-                distance = np.linalg.norm(
-                    np.array(position) - np.array(prev_position))
-                if distance < min_distance and distance < self.distance_threshold:
-                    closest_id, min_distance = blob_id, distance
-
-            # If a close match is found, update the position of the existing blob
-            if closest_id is not None:
-                new_positions[closest_id] = (position, size)
-            else:
-                # Assign a new or recycled ID to the unmatched blob
-                new_id = self._get_new_id()
-                new_positions[new_id] = (position, size)
-
-        # Collect IDs of blobs that weren't matched in this frame to free up those IDs
-        for blob_id in set(self.blob_positions) - set(new_positions):
-            # print(f"Blob {blob_id} disappeared.")
-            self.freed_ids.append(blob_id)
-
-        # Update blob positions for the next frame
-        self.blob_positions = new_positions
-
-        return self.blob_positions
-
-    def _get_new_id(self):
-        """Get a new or recycled ID for a blob."""
-        if self.freed_ids:
-            # Reuse the lowest available ID from freed IDs
-            return self.freed_ids.pop(0)
-        else:
-            # Assign the next new ID
-            self.next_id += 1
-            return self.next_id
-
-    def get_blob_color(self, blob_id):
-        """Get a persistent color for each blob ID."""
-        return colors[blob_id % len(colors)]
-
-
-class BlobToMIDIConverter:
-    def __init__(self, note_grid, midi_port):
-        """
-        Initialize the BlobToMIDIConverter with a note grid and MIDI output port.
-        :param note_grid: Instance of MIDINoteGrid that represents the note grid.
-        :param midi_port: MIDI output port for sending MIDI messages.
-        """
-        self.note_grid = note_grid
-        self.midi_port = midi_port
-        self.active_notes = {}  # Dictionary to keep track of active notes by blob ID
-
-    def process_blobs(self, blob_positions):
-        """
-        Process blobs and handle MIDI note triggering based on their presence in the note grid.
-        :param blob_positions: Dictionary with blob IDs as keys and positions as values.
-        """
-        # Iterate over each blob's position and size
-        for blob_id, (position, size) in blob_positions.items():
-
-            x, y = position
-
-            # the calculation below is makeshift and SUCKS but works for now; make it better
-            grid_x = (x * effective_width //
-                      window_width) + (padding_offset * (effective_width // window_width) + (padding_offset//2) - 5)
-            grid_y = (y *
-                      effective_height // window_height) + (padding_offset * (effective_width // window_width) + (padding_offset//2) - 5)
-
-            row, col = self._get_grid_position(grid_x, grid_y)
-
-            if row is not None and col is not None:
-                midi_note = self.note_grid.get_note_at_position(row, col)
-                note_name = self.note_grid.midi_to_note_name(
-                    midi_note)  # Get note name
-
-                # Calculate velocity as twice the blob size, clamped to 1–127
-                velocity = max(1, min(127, int(size * 2)))
-
-                # Check if this blob is already active on this note
-                if blob_id not in self.active_notes:
-
-                    # Start a new note and record the initial position
-                    initial_rel_x = (grid_x % (effective_width // self.note_grid.columns)
-                                     ) / (effective_width // self.note_grid.columns)
-                    note = MIDINote(midi_channel=blob_id %
-                                    16, midi_note=midi_note, velocity=velocity)
-                    note.open_midi_port(self.midi_port)
-                    note.send_note_on()
-                    self.active_notes[blob_id] = {
-                        "note": note,
-                        "start_col": col,
-                        "initial_rel_x": initial_rel_x,  # Store initial position
-                    }
-
-                    print(f"\nBlob {blob_id} started note {
-                          note_name} with velocity {velocity}")
-
-                else:
-                    # Apply pitch bend based on blob position
-                    note_data = self.active_notes[blob_id]
-                    start_col = note_data["start_col"]
-                    # Retrieve the stored initial position
-                    initial_rel_x = note_data["initial_rel_x"]
-                    pitch_bend = self._calculate_pitch_bend(
-                        grid_x, grid_y, row, col, start_col, initial_rel_x)
-                    if note_data["note"].output_port:
-                        note_data["note"].output_port.send(
-                            mido.Message(
-                                'pitchwheel', channel=0, pitch=pitch_bend)
-                        )
-                        print(f"\nBlob {blob_id}: Applied Pitch Bend {
-                              pitch_bend}")
-
-        # Check for any blobs that have disappeared and stop their notes
-        self._stop_disappeared_blobs(blob_positions)
-
-    def _calculate_pitch_bend(self, grid_x, grid_y, row, col, start_col, initial_rel_x, pitch_bend_range=12):
-        """Calculate the pitch bend value relative to the initial position."""        # Determine the cell width and height
-        cell_width = effective_width // self.note_grid.columns
-        cell_height = effective_height // len(self.note_grid.grid)
-
-        # Current horizontal position within block
-        rel_x = (grid_x % cell_width) / cell_width
-        # Current vertical position within block
-        rel_y = (grid_y % cell_height) / cell_height
-
-        if col == start_col:
-            # Manual Vibrato with Non-Linear Curve
-            pitch_bend_per_semitone = 8192 // pitch_bend_range
-
-            # How far the blob has moved from its initial position
-            distance = rel_x - initial_rel_x
-
-            # Apply a quadratic curve: subtle near 0, steeper near edges
-
-            curved_distance = distance ** cv2.getTrackbarPos(
-                "Pitch Curve", "Sensor Matrix")
-
-            # curved_distance = distance ** 7  # Cubic curve for more subtle start
-
-            pitch_bend = int(curved_distance * 2 * pitch_bend_per_semitone)
-
-            print(f"Manual Vibrato: rel_x={rel_x:.2f}, initial_rel_x={initial_rel_x:.2f}, "
-                  f"distance={distance:.2f}, curved_distance={curved_distance:.2f}, pitch_bend={pitch_bend}")
-        else:
-            # Note Bend: Calculate based on horizontal movement to a new block
-            note_diff = col - start_col
-            pitch_bend_per_semitone = 8192 // pitch_bend_range
-            pitch_bend = note_diff * pitch_bend_per_semitone
-
-            print(f"Note Bend: col={col}, start_col={start_col}, note_diff={
-                note_diff}, pitch_bend={pitch_bend}")
-
-        # Clamp the pitch bend value to the valid range
-        pitch_bend = max(-8192, min(8191, pitch_bend))
-
-        # Debugging output
-        print(f"Grid X: {grid_x}, Grid Y: {grid_y}")
-        print(f"Relative X: {rel_x:.2f}, Relative Y: {rel_y:.2f}")
-        print(f"Calculated Pitch Bend: {pitch_bend}")
-
-        return pitch_bend
-
-    def _get_grid_position(self, grid_x, grid_y):
-        """Calculate the row and column in the note grid based on adjusted grid coordinates."""
-        cell_width = effective_width // self.note_grid.columns
-        cell_height = effective_height // len(self.note_grid.grid)
-
-        col = grid_x // cell_width
-        row = grid_y // cell_height
-
-        if 0 <= row < len(self.note_grid.grid) and 0 <= col < self.note_grid.columns:
-            return row, col
-        return None, None
-
-    def _stop_disappeared_blobs(self, blob_positions):
-        """
-        Stop and clear notes for blobs that have disappeared.
-        :param blob_positions: Current frame's blob positions.
-        """
-        # Find blob IDs that were active but are no longer present
-        disappeared_blobs = set(self.active_notes.keys()) - \
-            set(blob_positions.keys())
-
-        for blob_id in disappeared_blobs:
-            note_data = self.active_notes.pop(
-                blob_id)  # Get the dict for the blob
-            note = note_data["note"]  # Extract the MIDINote object
-            note_name = self.note_grid.midi_to_note_name(
-                note.midi_note)  # Get note name
-
-            # Send a MIDI note-off message
-            if note.output_port:
-                note.output_port.send(mido.Message(
-                    'note_off', channel=note.midi_channel, note=note.midi_note))
-                print(f"Blob {blob_id} stopped note {note_name}")
-
-            # Clear the note grid block color here (customize as needed)
-
-    def _get_grid_position(self, x, y):
-        """
-        Convert x, y coordinates to the row and column in the note grid.
-        :param x: x-coordinate of the blob.
-        :param y: y-coordinate of the blob.
-        :return: Tuple of (row, col) corresponding to the note grid position.
-        """
-        # Calculate row and column based on the grid's dimensions and padding offset
-        effective_width = original_width - (2 * padding_offset)
-        effective_height = original_height - (2 * padding_offset)
-
-        cell_width = effective_width // self.note_grid.columns
-        cell_height = effective_height // len(self.note_grid.grid)
-
-        # Map the blob’s coordinates to the grid dimensions
-        # Ensure x and y are adjusted for padding offset, then scale by cell size
-        col = (x - padding_offset) * self.note_grid.columns // effective_width
-        row = (y - padding_offset) * \
-            len(self.note_grid.grid) // effective_height
-
-        if 0 <= row < len(self.note_grid.grid) and 0 <= col < self.note_grid.columns:
-            return row, col
-        return None, None
-
-    def stop_all_notes(self):
-        """Stops all active notes by sending note_off messages."""
-        for blob_id, note in list(self.active_notes.items()):
-            if note.output_port:
-                note.output_port.send(mido.Message(
-                    'note_off', channel=note.midi_channel, note=note.midi_note))
-            # Remove the note from active notes after stopping it
-            self.active_notes.pop(blob_id)
-        print("\n\nAll active notes stopped.")
-
-
-def map_value(value, in_min=0, in_max=1023, out_min=0, out_max=255):
-    # Function to map the 0-1023 values to a grayscale range
-    # could also bit shift it from 10 to 8 (computationally faster)
-    return int(value/4)
-
-
-def generate_image(data):
-    # Function to convert the sensor data into a 20x10 image
-    # Reshape the flat list into a 20x10 numpy array
-    matrix = np.array(data).reshape((10, 20))
-
-    # Map the 0-1023 range to 0-255 for grayscale
-    mapped_matrix = np.vectorize(map_value)(matrix)
-
-    # Resize the 20x10 image to make it larger for visualization
-    resized_image = cv2.resize(mapped_matrix.astype(
-        np.uint8), (780, 390), interpolation=cv2.INTER_LANCZOS4)
-
-    # Define yellow color for border in BGR format
-    padding_color = (255)
-
-    # Add padding to the resized image
-    padded_image = cv2.copyMakeBorder(
-        # Padded border
-        resized_image, padding_offset, padding_offset, padding_offset, padding_offset, cv2.BORDER_CONSTANT, value=padding_color)
-
-    # # Print for debugging
-    # print(f"Padding: {padding_offset}, Border Color: {padding_color}")
-
-    return resized_image, padded_image
-
-
 def initialize_blob_detector():
 
     # Initialize blob detector with parameters
@@ -398,14 +128,6 @@ def initialize_blob_detector():
     return cv2.SimpleBlobDetector_create(params)
 
 
-def apply_threshold_and_invert(img, min_val=250, max_val=255):
-    # Apply a threshold and ensure background is white where there are no blobs
-    # Invert binary threshold to keep darker blobs
-    _, thresholded_img = cv2.threshold(
-        img, min_val, max_val, cv2.THRESH_BINARY)
-    return thresholded_img
-
-
 def nothing(x):
     # Callback function for trackbars (required but not used)
     pass
@@ -422,17 +144,21 @@ def create_trackbars():
     cv2.createTrackbar("Pitch Curve", "Sensor Matrix", 7, 10, nothing)
 
 
-def overlay_note_grid(display_img, note_grid, padding_offet, active_notes, alpha=0.5):
+def overlay_note_grid(display_img, note_grid, padding_offet, sounding_notes, alpha=0.5):
     # Calculate effective dimensions of the note grid
     effective_width = display_img.shape[1] - (2 * padding_offset)
     effective_height = display_img.shape[0] - (2 * padding_offset)
 
     # Determine the number of rows and columns in the note grid
-    rows, cols = len(note_grid.grid), len(note_grid.grid[0])
+    rows, cols = note_grid.note_table.shape
 
     # Create a temporary overlay for the grid
     overlay = display_img.copy()
 
+    # Notes currently held by a touch
+    sounding_notes = set(sounding_notes.tolist())
+    note_table = note_grid.note_table.tolist()
+
     # Calculate cell width and height based on the effective grid size
     cell_width = effective_width // cols
     cell_height = effective_height // rows
@@ -443,17 +169,15 @@ def overlay_note_grid(display_img, note_grid, padding_offet, active_notes, alpha
     for row in range(rows):
         for col in range(cols):
 
-            # Get the MIDI note number at the position
-            note_number = note_grid.get_note_at_position(row, col)
-            # Convert the MIDI note number to the note name
-            note_name = note_grid.midi_to_note_name(
-                note_number, include_octave=True)
+            # MIDI note and name from the grid's compiled tables
+            note_number = note_table[row][col]
+            note_name = note_grid.cell_names[row][col]
 
             x = padding_offset + (col * cell_width)
             y = padding_offset + (row * cell_height)
 
             # Determine color based on whether the note is active
-            if note_number in [note_data["note"].midi_note for note_data in active_notes.values()]:
+            if note_number in sounding_notes:
                 color = (0, 255, 0)  # Green for active notes
             else:
                 color = (200, 200, 200)  # Gray for inactive notes
@@ -472,27 +196,6 @@ def overlay_note_grid(display_img, note_grid, padding_offet, active_notes, alpha
     return display_img
 
 
-# Define a set of predefined colors
-colors = [
-    (95, 89, 255),      # Coral Red (FF595F)
-    (57, 202, 255),     # Golden Yellow (FFCA39)
-    (39, 201, 138),     # Lime Green (8AC927)
-    (196, 130, 26),     # Azure Blue (1A82C4)
-    (147, 76, 106),     # Royal Purple (6A4C93)
-    (77, 146, 255),     # Peach Orange (FF924D)
-    (117, 166, 83),     # Forest Green (53A675)
-    (220, 218, 168),    # Pale Aqua (A8DADC)
-    (49, 202, 197),     # Chartreuse (C5CA31)
-    (172, 103, 66),     # Steel Blue (4267AC)
-    (121, 83, 181),     # Magenta Pink (B55379)
-    (145, 110, 140),    # Mauve (8C6E91)
-    (103, 139, 182),    # Taupe (B68B67)
-    (249, 237, 250),    # Blush Pink (FAEDF9)
-    (87, 53, 30),       # Deep Navy (1E3557)
-    (167, 184, 219)     # Sand Beige (DBB8A7)
-]
-
-
 if __name__ == '__main__':
     # Serial port setup
     comport = '/dev/cu.usbmodem126032001'
@@ -513,12 +216,16 @@ if __name__ == '__main__':
         print(f"\n\nDevice not connected. Using dummy data.")
 
     # Initialize blob tracker
-    blob_tracker = PersistentBlobTracker()
+    # lead_ms > 0 projects positions ahead along each track's velocity; it helps slides but
+    # overshoots vibrato at the serial frame rate (see prediction_benchmark.py)
+    blob_tracker = PersistentBlobTracker(lead_ms=0)
 
     # Initialize OpenCV window and blob detector
     cv2.namedWindow("Sensor Matrix", cv2.WINDOW_NORMAL)
     create_trackbars()  # Create trackbars for on-screen controls
     detector = initialize_blob_detector()
+    # Shape features (area, orientation, pressure, ...) for every detected blob
+    feature_extractor = BlobFeatureExtractor()
 
     # Toggle view states
 
@@ -543,14 +250,55 @@ if __name__ == '__main__':
 
     # Create the note grid
     note_grid = MIDINoteGrid()
+    # User layouts (note maps, row intervals or isomorphic steps) are compiled once at startup
+    for layout_path in sorted(glob.glob("layouts/*.yaml")):
+        note_grid.add_layout(load_layout(layout_path))
+    # Scala tunings to cycle through; a .kbm with the same name is used as the keyboard mapping
+    microtunings = [None] + sorted(glob.glob("tunings/*.scl"))
+    microtuning_index = 0
     print(note_grid)
 
     # Define MIDI port name and initialize BlobToMIDIConverter
     midi_port_name = "IAC Driver TacTile"  # Adjust this as needed
-    midi_converter = BlobToMIDIConverter(note_grid, midi_port_name)
+    # The named port if it exists, else a virtual port, else memory (so the trial starts anywhere);
+    # the memory fallback keeps only recent messages, the recorder ring has the full capture
+    midi_sink = open_sink("auto", midi_port_name, max_messages=4096)
+    print("MIDI output:", type(midi_sink).__name__, midi_port_name)
+    # Everything sent is kept in a ring, so 'w' can save the last minutes without recording first
+    midi_recorder = MIDIFileRecorder(forward=midi_sink)
+    midi_converter = BlobToMIDIConverter(
+        note_grid, midi_port_name, max_tracks=blob_tracker.max_tracks, sink=midi_recorder,
+        padding_offset=padding_offset, original_size=(original_width, original_height),
+        # Holds a note-on for at most 2 frames to measure the strike; mode="immediate" adds no delay
+        velocity_estimator=VelocityEstimator(blob_tracker, mode="slope", hold_frames=2))
+
+    # OSC output for SuperCollider/Max rigs: one bundle of touches per frame, alongside MIDI
+    osc_enabled = False
+    osc_sender = OSCSender(host="127.0.0.1", port=57120, max_tracks=blob_tracker.max_tracks,
+                           padding_offset=padding_offset)
+
+    # Presets: number keys recall (applied at the start of the next frame), 'm' then a number stores
+    preset_bank = PresetBank(note_grid, midi_converter, path="presets.json", handoff="hold")
+    store_preset = False
+
+    # Gesture mode turns the surface into a controller: touches trigger actions instead of notes
+    gesture_mode = False
+    gesture_recognizer = GestureRecognizer(max_tracks=blob_tracker.max_tracks)
+    gesture_actions = {
+        'swipe_up': lambda: note_grid.transpose_octave('up'),
+        'swipe_down': lambda: note_grid.transpose_octave('down'),
+        'double_tap': note_grid.cycle_scale_mode,
+        'pinch': midi_converter.stop_all_notes,  # Panic
+    }
 
     while True:
 
+        # Switch presets between frames, never in the middle of one
+        if preset_bank.apply():
+            cv2.setTrackbarPos("Pitch Curve", "Sensor Matrix",
+                               int(midi_converter.bend_curve.exponent))
+            print(note_grid)
+
         # Read current trackbar positions for threshold and area parameters
         threshold_min = cv2.getTrackbarPos("Thresh Min", "Sensor Matrix")
         threshold_max = cv2.getTrackbarPos("Thresh Max", "Sensor Matrix")
@@ -558,6 +306,9 @@ if __name__ == '__main__':
         area_max = cv2.getTrackbarPos("Area Max", "Sensor Matrix")
         circularity_min = cv2.getTrackbarPos("Circ Min", "Sensor Matrix")
         circularity_max = cv2.getTrackbarPos("Circ Max", "Sensor Matrix")
+        # Bend tables are only rebuilt when the curve setting changes
+        midi_converter.bend_curve.configure(
+            exponent=cv2.getTrackbarPos("Pitch Curve", "Sensor Matrix"))
 
         # Update blob detector parameters
         detector = initialize_blob_detector()
@@ -582,7 +333,7 @@ if __name__ == '__main__':
                 continue
 
         # Generate the image from the sensor data
-        original_img, padded_img = generate_image(sensor_data)
+        original_img, padded_img = generate_image(sensor_data, padding_offset)
 
         # Apply inverted thresholding to keep darker areas as blobs
         thresholded_img = apply_threshold_and_invert(
@@ -598,10 +349,25 @@ if __name__ == '__main__':
         # Perform blob detection on the image
         keypoints = detector.detect(thresholded_img)
 
-        blob_positions = blob_tracker.update_blobs(keypoints)
+        # Measure each blob's moments and pressure in a single pass
+        blobs = feature_extractor.extract(
+            keypoints, thresholded_img, padded_img)
+
+        tracks = blob_tracker.update_blobs(blobs)
 
-        # Process blob positions for MIDI notes
-        midi_converter.process_blobs(blob_positions)
+        if osc_enabled:
+            osc_sender.send_frame(tracks)
+
+        if gesture_mode:
+            # Run bound actions for recognized gestures
+            for event in gesture_recognizer.update(tracks, blob_tracker.time):
+                event_log.info("gesture", "Gesture {} ({:.0f} ms after completion)",
+                               event.name, event.latency_ms)
+                if event.name in gesture_actions:
+                    gesture_actions[event.name]()
+        else:
+            # Process blob positions for MIDI notes
+            midi_converter.process_blobs(tracks)
 
         # Show thresholded image if enabled
         if show_threshold == 0:
@@ -617,15 +383,17 @@ if __name__ == '__main__':
         # Show note grid if enabled
         if show_note_grid:
             display_img = overlay_note_grid(
-                display_img, note_grid, padding_offset, midi_converter.active_notes, alpha=0.5)
+                display_img, note_grid, padding_offset, tracks.note[tracks.note >= 0], alpha=0.5)
 
         # Show blobs if enabled
         if show_blobs:
             # Convert to color to draw in color
             blob_image = cv2.cvtColor(thresholded_img, cv2.COLOR_GRAY2BGR)
 
-            for blob_id, (position, size) in blob_positions.items():
-                x, y = position
+            for slot in np.flatnonzero(tracks.active).tolist():
+                blob_id = int(tracks.id[slot])
+                x, y = int(tracks.x[slot]), int(tracks.y[slot])
+                size = int(tracks.size[slot])
 
                 grid_x = (x * effective_width //
                           window_width) + (padding_offset * (effective_width // window_width) + (padding_offset//2) - 5)
@@ -673,6 +441,57 @@ if __name__ == '__main__':
             show_blobs = not show_blobs  # Toggle show_blobs
         elif key == ord('n'):  # Toggle note grid display
             show_note_grid = not show_note_grid
+        elif key == ord('g'):
+            # Toggle gesture mode; silence anything still sounding
+            gesture_mode = not gesture_mode
+            midi_converter.stop_all_notes()
+            print("Gesture mode", "on" if gesture_mode else "off")
+        elif key == ord('e'):
+            # Toggle MPE mode (one channel per touch with per-note bend, pressure and slide)
+            midi_converter.set_mpe(not midi_converter.mpe)
+            print("MPE mode", "on" if midi_converter.mpe else "off")
+        elif key == ord('o'):
+            # Toggle the OSC output
+            osc_enabled = not osc_enabled
+            print("OSC output", "on" if osc_enabled else "off", "to", osc_sender.address)
+        elif key == ord('r'):
+            # Start/stop streaming the performance to a MIDI file
+            if midi_recorder.recording:
+                midi_recorder.stop()
+            else:
+                midi_recorder.start(time.strftime("recordings/performance_%Y%m%d_%H%M%S.mid"))
+        elif key == ord('w'):
+            # Save the last 5 minutes played
+            midi_recorder.save_last(time.strftime("recordings/last_%Y%m%d_%H%M%S.mid"), minutes=5)
+        elif key == ord('j'):
+            # Next keyboard layout (precompiled, so switching mid-performance is instant)
+            print("Layout:", note_grid.cycle_layout())
+        elif key == ord('u'):
+            # Next microtuning; the bend offsets only apply in MPE mode (one channel per note)
+            microtuning_index = (microtuning_index + 1) % len(microtunings)
+            scl_path = microtunings[microtuning_index]
+            if scl_path is None:
+                note_grid.clear_microtuning()
+            else:
+                kbm_path = scl_path[:-4] + ".kbm"
+                note_grid.load_microtuning(scl_path, kbm_path if os.path.exists(kbm_path) else None)
+            print(note_grid)
+        elif key == ord('m'):
+            store_preset = True
+            print("Press 1-9 to store the current settings")
+        elif ord('1') <= key <= ord('9'):
+            slot = key - ord('0')
+            if store_preset:
+                preset_bank.store(slot)
+                store_preset = False
+                print("Stored preset", slot)
+            elif slot in preset_bank.failed:
+                print("Preset", slot, "could not be loaded:", preset_bank.failed[slot])
+            elif not preset_bank.recall(slot):
+                print("Preset", slot, "is empty")
+        elif key == ord('k'):
+            # Cycle the vibrato response curve
+            print("Pitch bend curve:", midi_converter.bend_curve.cycle_kind())
         elif key == ord('l'):
             # Toggle between regular and advanced dummy data generators
             use_advanced_dummy = not use_advanced_dummy
@@ -713,4 +532,14 @@ if __name__ == '__main__':
             break  # Quit the program
 
     # Release resources
+    print("Tracker:", blob_tracker.metrics())
+    print("MIDI controller filter:", midi_converter.output.metrics())
+    print("MIDI sender:", midi_converter.sender.metrics())
+    print("Velocity:", midi_converter.velocity_estimator.metrics())
+    print("Presets:", preset_bank.metrics())
+    midi_converter.close()
+    midi_recorder.close()
+    print("MIDI recorder:", midi_recorder.metrics())
+    osc_sender.close()
+    close_all_ports()
     cv2.destroyAllWindows()
@@ -0,0 +1,61 @@
+import numpy as np
+import cv2
+
+
+def map_value(value, in_min=0, in_max=1023, out_min=0, out_max=255):
+    # Function to map the 0-1023 values to a grayscale range
+    # could also bit shift it from 10 to 8 (computationally faster)
+    return int(value/4)
+
+
+def generate_image(data, padding_offset=30):
+    # Function to convert the sensor data into a 20x10 image
+    # Reshape the flat list into a 20x10 numpy array
+    matrix = np.array(data).reshape((10, 20))
+
+    # Map the 0-1023 range to 0-255 for grayscale
+    mapped_matrix = np.vectorize(map_value)(matrix)
+
+    # Resize the 20x10 image to make it larger for visualization
+    resized_image = cv2.resize(mapped_matrix.astype(
+        np.uint8), (780, 390), interpolation=cv2.INTER_LANCZOS4)
+
+    # Define yellow color for border in BGR format
+    padding_color = (255)
+
+    # Add padding to the resized image
+    padded_image = cv2.copyMakeBorder(
+        # Padded border
+        resized_image, padding_offset, padding_offset, padding_offset, padding_offset, cv2.BORDER_CONSTANT, value=padding_color)
+
+    # # Print for debugging
+    # print(f"Padding: {padding_offset}, Border Color: {padding_color}")
+
+    return resized_image, padded_image
+
+
+def create_blob_detector(min_threshold=10, max_threshold=255, min_area=120, max_area=12000,
+                         filter_by_area=True):
+    """Create a blob detector from explicit parameters (no trackbars needed)."""
+    params = cv2.SimpleBlobDetector_Params()
+
+    params.minThreshold = min_threshold
+    params.maxThreshold = max_threshold
+
+    params.filterByArea = filter_by_area
+    params.minArea = min_area
+    params.maxArea = max_area
+
+    params.filterByCircularity = False
+    params.filterByConvexity = False
+    params.filterByInertia = False
+
+    return cv2.SimpleBlobDetector_create(params)
+
+
+def apply_threshold_and_invert(img, min_val=250, max_val=255):
+    # Apply a threshold and ensure background is white where there are no blobs
+    # Invert binary threshold to keep darker blobs
+    _, thresholded_img = cv2.threshold(
+        img, min_val, max_val, cv2.THRESH_BINARY)
+    return thresholded_img
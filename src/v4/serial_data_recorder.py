@@ -1,6 +1,7 @@
 import numpy as np
 import cv2
 import serial_reader
+from event_log import event_log
 # import keyboard
 
 # Configuration
@@ -17,6 +18,7 @@ def main():
     global recording, frames
 
     print("Press 'r' to start/stop recording, 'q' to quit.")
+    event_log.set_sampling("recorder", 30)  # Progress about every 30 frames
 
     # Create an OpenCV window with a placeholder image to capture key events
     cv2.imshow("Sensor Matrix", np.zeros((100, 100), dtype=np.uint8))
@@ -38,7 +40,7 @@ def main():
         # Record frame if recording is active
         if recording:
             frames.append(sensor_data)
-            print(f"Frame recorded: {len(frames)}")
+            event_log.info("recorder", "Frame recorded: {}", len(frames))
 
             # Stop recording once max_frames is reached
             if len(frames) >= max_frames:
@@ -46,6 +48,7 @@ def main():
                 recording = False
 
     # Save frames to a file for looping later
+    event_log.flush()
     save_frames(frames)
 
 
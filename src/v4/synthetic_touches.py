@@ -0,0 +1,51 @@
+import numpy as np
+
+
+# Sensor matrix dimensions (rows, columns) and the value of an untouched cell
+SENSOR_SHAPE = (10, 20)
+UNTOUCHED = 1023
+
+
+def render_frame(touches, background=None, noise=8.0, footprint=0.7, rng=None):
+    """
+    Render touches into one flat 200-value sensor frame.
+    :param touches: Iterable of (row, col, pressure) in sensor cell units; pressure 0-1.
+    :param background: Optional 200-value frame (e.g. a recording) to press into.
+    :param noise: Standard deviation of additive sensor noise.
+    :param footprint: Gaussian sigma of a fingertip in cells.
+    :return: Flat int array of 200 values in the 0-1023 range.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    rows, cols = np.mgrid[0:SENSOR_SHAPE[0], 0:SENSOR_SHAPE[1]]
+    if background is None:
+        frame = np.full(SENSOR_SHAPE, float(UNTOUCHED))
+    else:
+        frame = np.asarray(background, dtype=float).reshape(SENSOR_SHAPE).copy()
+
+    # Each fingertip pulls the reading towards zero under its footprint
+    for row, col, pressure in touches:
+        g = np.exp(-((rows - row) ** 2 + (cols - col) ** 2) / (2 * footprint ** 2))
+        frame *= 1 - pressure * g
+
+    frame += rng.normal(0, noise, SENSOR_SHAPE)
+    return np.clip(np.rint(frame), 0, UNTOUCHED).astype(int).ravel()
+
+
+def vibrato_trajectory(n_frames, frame_ms, row=4.5, col=6.0, slide_cells=5.0,
+                       vibrato_cells=0.4, vibrato_hz=5.0, pressure=1.0):
+    """
+    One fingertip sliding along a row while applying vibrato.
+    :return: (n_frames, 3) array of (row, col, pressure) per frame.
+    """
+    t = np.arange(n_frames) * frame_ms / 1000
+    duration = max(t[-1], 1e-9)
+    cols = col + slide_cells * t / duration + \
+        vibrato_cells * np.sin(2 * np.pi * vibrato_hz * t)
+    return np.column_stack((np.full(n_frames, row), cols, np.full(n_frames, pressure)))
+
+
+def sensor_to_pixels(row, col, padding_offset=30, image_size=(780, 390)):
+    """Convert sensor cell coordinates to padded image pixel coordinates."""
+    x = (col + 0.5) * image_size[0] / SENSOR_SHAPE[1] + padding_offset
+    y = (row + 0.5) * image_size[1] / SENSOR_SHAPE[0] + padding_offset
+    return x, y
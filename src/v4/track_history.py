@@ -0,0 +1,100 @@
+import numpy as np
+
+
+# Fields stored for every history sample
+HIST_X = 0
+HIST_Y = 1
+HIST_PRESSURE = 2
+HIST_TIME = 3
+HIST_FIELDS = 4
+
+
+class TrackHistory:
+    def __init__(self, max_tracks=32, history_len=16):
+        """
+        Fixed-capacity ring buffer of recent samples for every track slot, plus
+        velocity, acceleration and pressure slope derived from the newest samples.
+        Everything is preallocated; updates only write into existing arrays.
+        :param max_tracks: Number of track slots (matches the tracker).
+        :param history_len: Samples kept per slot.
+        """
+        self.max_tracks = max_tracks
+        self.history_len = history_len
+        self.buffer = np.zeros((max_tracks, history_len, HIST_FIELDS))
+        self.count = np.zeros(max_tracks, dtype=np.int64)  # Samples written since birth
+
+        # Derived kinematics, refreshed by update_kinematics()
+        self.velocity = np.zeros((max_tracks, 2))  # Pixels per second
+        self.acceleration = np.zeros((max_tracks, 2))  # Pixels per second squared
+        self.pressure_slope = np.zeros(max_tracks)  # Pressure units per second
+
+        # Scratch space so update_kinematics() allocates nothing
+        self._flat = self.buffer.reshape(max_tracks * history_len, HIST_FIELDS)
+        self._row_base = np.arange(max_tracks, dtype=np.int64) * history_len
+        self._index = np.zeros(max_tracks, dtype=np.int64)
+        self._newest = [np.zeros((max_tracks, HIST_FIELDS)) for _ in range(3)]
+        self._dt = [np.zeros(max_tracks) for _ in range(3)]
+        self._step = [np.zeros((max_tracks, 2)) for _ in range(2)]
+        self._valid = np.zeros(max_tracks, dtype=bool)
+
+    def reset(self, slots):
+        """Forget the history of slots that were just (re)assigned to new tracks."""
+        self.count[slots] = 0
+        self.velocity[slots] = 0
+        self.acceleration[slots] = 0
+        self.pressure_slope[slots] = 0
+
+    def record(self, slots, positions, pressures, timestamp):
+        """
+        Append one sample for each of the given slots.
+        :param slots: Slot indices that have a new measurement.
+        :param positions: (len(slots), 2) positions.
+        :param pressures: Pressure value per slot.
+        :param timestamp: Frame time in seconds.
+        """
+        index = self.count[slots] % self.history_len
+        self.buffer[slots, index, HIST_X] = positions[:, 0]
+        self.buffer[slots, index, HIST_Y] = positions[:, 1]
+        self.buffer[slots, index, HIST_PRESSURE] = pressures
+        self.buffer[slots, index, HIST_TIME] = timestamp
+        self.count[slots] += 1
+
+    def newest(self, age=0):
+        """
+        Sample from every slot `age` steps before its newest one (valid when count > age).
+        Returns a preallocated (max_tracks, HIST_FIELDS) array, overwritten on the next call
+        with the same age.
+        """
+        np.subtract(self.count, 1 + age, out=self._index)
+        np.remainder(self._index, self.history_len, out=self._index)
+        np.add(self._index, self._row_base, out=self._index)
+        return np.take(self._flat, self._index, axis=0, out=self._newest[age])
+
+    def update_kinematics(self):
+        """Recompute velocity, acceleration and pressure slope for all slots at once."""
+        s0, s1, s2 = self.newest(0), self.newest(1), self.newest(2)
+        dt01, dt12, dt02 = self._dt
+        step01, step12 = self._step
+
+        # Velocity and pressure slope from the two newest samples
+        np.subtract(s0[:, HIST_TIME], s1[:, HIST_TIME], out=dt01)
+        np.maximum(dt01, 1e-6, out=dt01)
+        np.subtract(s0[:, :2], s1[:, :2], out=step01)
+        np.divide(step01, dt01[:, None], out=step01)
+        np.greater_equal(self.count, 2, out=self._valid)
+        np.multiply(step01, self._valid[:, None], out=self.velocity)
+        np.subtract(s0[:, HIST_PRESSURE], s1[:, HIST_PRESSURE], out=self.pressure_slope)
+        np.divide(self.pressure_slope, dt01, out=self.pressure_slope)
+        np.multiply(self.pressure_slope, self._valid, out=self.pressure_slope)
+
+        # Acceleration from the change between the two newest velocities
+        np.subtract(s1[:, HIST_TIME], s2[:, HIST_TIME], out=dt12)
+        np.maximum(dt12, 1e-6, out=dt12)
+        np.subtract(s1[:, :2], s2[:, :2], out=step12)
+        np.divide(step12, dt12[:, None], out=step12)
+        np.subtract(step01, step12, out=step12)
+        np.add(dt01, dt12, out=dt02)
+        np.multiply(dt02, 0.5, out=dt02)
+        np.divide(step12, dt02[:, None], out=step12)
+        np.greater_equal(self.count, 3, out=self._valid)
+        np.multiply(step12, self._valid[:, None], out=self.acceleration)
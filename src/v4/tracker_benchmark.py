@@ -0,0 +1,223 @@
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from sensor_image import generate_image, apply_threshold_and_invert, create_blob_detector
+from blob_features import BlobFeatureExtractor
+from blob_tracker import PersistentBlobTracker, solve_assignment
+from synthetic_touches import SENSOR_SHAPE, render_frame, sensor_to_pixels
+
+
+# The serial link delivers roughly 14 frames per second at 115200 baud
+FRAME_MS = 70.0
+
+# Detector/tracker configurations to compare; anything omitted uses the main loop's defaults
+CONFIGS = {
+    "default": {},
+    "no_padding": {"padding_offset": 0},
+    "min_area_60": {"detector": {"min_area": 60}},
+    "min_area_240": {"detector": {"min_area": 240}},
+    "threshold_40": {"threshold": 40},
+    "greedy": {"tracker": {"matching": "greedy"}},
+    "gate_50px": {"tracker": {"distance_threshold": 50}},
+    "confirm_1": {"tracker": {"confirm_frames": 1}},
+    "coast_0": {"tracker": {"coast_frames": 0}},
+}
+
+
+def scenario_touches(name, n_frames, frame_ms=FRAME_MS):
+    """
+    Ground truth for one scenario.
+    :param frame_ms: Frame interval, for scenarios with motion at a real-time rate.
+    :return: (n_frames, n_touches, 3) array of (row, col, pressure); NaN where a touch is up.
+    """
+    t = np.linspace(0, 1, n_frames)
+    frames = np.arange(n_frames)
+    seconds = frames * frame_ms / 1000
+
+    def touch(rows, cols, pressure=1.0, start=0, end=n_frames):
+        out = np.full((n_frames, 3), np.nan)
+        down = (frames >= start) & (frames < end)
+        out[down] = np.column_stack(
+            [np.broadcast_to(v, n_frames) for v in (rows, cols, pressure)])[down]
+        return out
+
+    if name == "single_slide":
+        touches = [touch(4.5, 2 + 15 * t)]
+    elif name == "chord_taps":
+        # Three fingers pressed and released one after another
+        third = n_frames // 3
+        touches = [touch(3, 4, 0.9, 0, 2 * third), touch(6, 10, 1.0, third // 2, n_frames),
+                   touch(3, 16, 0.8, third, n_frames - third // 2)]
+    elif name == "crossing":
+        # Two fingers sliding past each other on neighbouring rows
+        touches = [touch(3.5, 3 + 13 * t), touch(5.5, 16 - 13 * t)]
+    elif name == "vibrato_pair":
+        # Two fingers holding notes with 5 Hz vibrato and swelling pressure
+        wobble = 0.4 * np.sin(2 * np.pi * 5 * seconds)
+        swell = 0.6 + 0.4 * np.sin(np.pi * t)
+        touches = [touch(2.5, 5 + wobble, swell), touch(7, 14 - wobble, swell)]
+    elif name == "close_pair":
+        # Two fingers drawing together until they nearly merge, then apart again
+        gap = 1.5 + 4 * np.abs(2 * t - 1)
+        touches = [touch(4.5, 9.5 - gap / 2), touch(4.5, 9.5 + gap / 2)]
+    elif name == "edges":
+        # Fingers on the sensor border, where padding and minimum area decide what is found:
+        # one slowly pressing into a corner (its clipped blob grows through the area limits),
+        # one sliding along the bottom row and one sliding up the left edge
+        rows, cols = SENSOR_SHAPE
+        touches = [touch(0, 0, 0.6 + 0.02 * t), touch(rows - 1, 1 + (cols - 3) * t),
+                   touch(rows - 3 - (rows - 5) * t, 0, 0.9, n_frames // 4, n_frames)]
+    else:
+        raise ValueError(f"Unknown scenario: {name}")
+    return np.stack(touches, axis=1)
+
+
+SCENARIOS = ["single_slide", "chord_taps", "crossing", "vibrato_pair", "close_pair", "edges"]
+
+
+def run_config(config, truth, frame_ms, noise, match_px, rng, contact_gain=1.5, footprint=1.0):
+    """
+    Render the ground truth, run detector and tracker over it and score the result.
+    :param contact_gain: Scales ground-truth pressure into render depth; above 1 a firm
+                         press saturates the cells under the fingertip like the real sensor.
+    :return: Dict of metrics.
+    """
+    padding_offset = config.get("padding_offset", 30)
+    threshold = config.get("threshold", 10)
+    detector = create_blob_detector(**config.get("detector", {}))
+    extractor = BlobFeatureExtractor()
+    tracker = PersistentBlobTracker(**config.get("tracker", {}))
+
+    n_frames, n_touches, _ = truth.shape
+    rendered = truth * [1, 1, contact_gain]
+    frames = [render_frame(rendered[i][~np.isnan(rendered[i, :, 0])], noise=noise,
+                           footprint=footprint, rng=rng)
+              for i in range(n_frames)]
+    truth_x, truth_y = sensor_to_pixels(truth[:, :, 0], truth[:, :, 1], padding_offset)
+
+    errors, pressure_pairs, onsets = [], [], []
+    last_id = np.full(n_touches, -1)
+    down_since = np.full(n_touches, -1)
+    id_switches = misses = false_touches = truth_count = 0
+    stage_ms = np.zeros((n_frames, 4))  # image, detect, features, track
+
+    for i, frame in enumerate(frames):
+        t0 = time.perf_counter()
+        _, padded_img = generate_image(frame, padding_offset)
+        thresholded_img = apply_threshold_and_invert(padded_img, threshold, 255)
+        t1 = time.perf_counter()
+        keypoints = detector.detect(thresholded_img)
+        t2 = time.perf_counter()
+        blobs = extractor.extract(keypoints, thresholded_img, padded_img)
+        t3 = time.perf_counter()
+        tracks = tracker.update_blobs(blobs, timestamp=i * frame_ms / 1000)
+        t4 = time.perf_counter()
+        stage_ms[i] = np.diff([t0, t1, t2, t3, t4]) * 1000
+
+        # Pair ground-truth touches with reported touches by position
+        down = np.flatnonzero(~np.isnan(truth[i, :, 0]))
+        slots = np.flatnonzero(tracks.active)
+        expected = np.column_stack((truth_x[i, down], truth_y[i, down]))
+        reported = np.column_stack((tracks.x[slots], tracks.y[slots]))
+        distance = np.hypot(*(expected[:, None] - reported[None]).transpose(2, 0, 1))
+        rows = cols = np.zeros(0, dtype=np.intp)
+        if distance.size:
+            rows, cols = solve_assignment(distance)
+            keep = distance[rows, cols] <= match_px
+            rows, cols = rows[keep], cols[keep]
+
+        truth_count += len(down)
+        misses += len(down) - len(rows)
+        false_touches += len(slots) - len(cols)
+        errors.extend(distance[rows, cols])
+
+        # Touches that went down this frame start their onset clock
+        up = np.setdiff1d(np.arange(n_touches), down)
+        down_since[up] = -1
+        last_id[up] = -1
+        fresh = down[down_since[down] < 0]
+        down_since[fresh] = i
+
+        for touch, slot in zip(down[rows].tolist(), slots[cols].tolist()):
+            blob_id = tracks.id[slot]
+            if last_id[touch] < 0:
+                onsets.append((i - down_since[touch]) * frame_ms)
+            elif last_id[touch] != blob_id:
+                id_switches += 1
+            last_id[touch] = blob_id
+            pressure_pairs.append((truth[i, touch, 2], tracks.pressure[slot]))
+
+    frame_total = stage_ms.sum(axis=1)
+    pressure_pairs = np.array(pressure_pairs).reshape(-1, 2)
+    if len(pressure_pairs) > 2 and np.all(pressure_pairs.std(axis=0) > 0):
+        pressure_corr = float(np.corrcoef(pressure_pairs.T)[0, 1])
+    else:
+        pressure_corr = None
+    return {
+        "frames": n_frames,
+        "truth_touches": truth_count,
+        "position_rmse_px": float(np.sqrt(np.mean(np.square(errors)))) if errors else None,
+        "id_switches": id_switches,
+        "missed": misses,
+        "false_touches": false_touches,
+        "miss_rate": misses / truth_count if truth_count else 0.0,
+        "dropped_detections": tracker.dropped_detections,
+        "onset_latency_ms": float(np.mean(onsets)) if onsets else None,
+        "pressure_correlation": pressure_corr,
+        "frame_ms_mean": float(frame_total.mean()),
+        "frame_ms_p95": float(np.percentile(frame_total, 95)),
+        "frame_ms_max": float(frame_total.max()),
+        "stage_ms_mean": dict(zip(["image", "detect", "features", "track"],
+                                  stage_ms.mean(axis=0).tolist())),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Score detector/tracker configurations on synthetic touches with known "
+                    "ground truth and write the results as JSON.")
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--frame-ms', type=float, default=FRAME_MS)
+    parser.add_argument('--noise', type=float, default=8.0,
+                        help="Standard deviation of sensor noise (raw 0-1023 units)")
+    parser.add_argument('--contact-gain', type=float, default=1.5)
+    parser.add_argument('--footprint', type=float, default=1.0,
+                        help="Gaussian sigma of a fingertip in sensor cells")
+    parser.add_argument('--match-px', type=float, default=60.0,
+                        help="Furthest a reported touch may be from the truth to count as found")
+    parser.add_argument('--configs', nargs='+', default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument('--scenarios', nargs='+', default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON file to write (default: stdout)")
+    args = parser.parse_args()
+
+    results = []
+    for config_name in args.configs:
+        for scenario in args.scenarios:
+            # Same seed per scenario so every configuration sees identical frames
+            rng = np.random.default_rng([args.seed, SCENARIOS.index(scenario)])
+            truth = scenario_touches(scenario, args.frames, args.frame_ms)
+            metrics = run_config(CONFIGS[config_name], truth, args.frame_ms,
+                                 args.noise, args.match_px, rng,
+                                 args.contact_gain, args.footprint)
+            results.append({"config": config_name, "scenario": scenario, "metrics": metrics})
+            print(f"{config_name:>14} {scenario:>14}: rmse {metrics['position_rmse_px'] or 0:6.2f} px, "
+                  f"switches {metrics['id_switches']:3d}, missed {metrics['missed']:4d}, "
+                  f"false {metrics['false_touches']:4d}, {metrics['frame_ms_mean']:6.2f} ms/frame",
+                  file=sys.stderr)
+
+    report = {
+        "settings": {"frames": args.frames, "frame_ms": args.frame_ms, "noise": args.noise,
+                     "contact_gain": args.contact_gain, "footprint": args.footprint,
+                     "match_px": args.match_px, "seed": args.seed},
+        "configs": {name: CONFIGS[name] for name in args.configs},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
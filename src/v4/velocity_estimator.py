@@ -0,0 +1,139 @@
+import collections
+import numpy as np
+from track_history import HIST_PRESSURE, HIST_TIME
+from blob_tracker import ACTIVE
+from window_stats import window_stats
+
+
+MODES = ["slope", "immediate", "size"]
+
+
+class VelocityEstimator:
+    def __init__(self, tracker, mode="slope", hold_frames=2, hold_ms=None, frame_ms=70,
+                 min_rate=2e5, max_rate=1e7, exponent=1.0, latency_window=256):
+        """
+        Note-on velocity from how fast pressure rises when a touch lands, instead of blob size.
+        In "slope" mode a new note is held back for at most hold_frames frames (or hold_ms)
+        while the pressure keeps rising; it is released early once pressure stops rising.
+        "immediate" uses only the samples the tracker already has (zero added delay),
+        "size" is the old twice-the-blob-size velocity.
+        The peak rise rate is mapped through a 128-entry velocity curve table.
+        Only frames where the touch is detected count toward the hold; the delay is measured
+        on the tracker's frame clock.
+        :param tracker: The PersistentBlobTracker (its TrackHistory holds pressure and time
+                        per sample).
+        :param mode: One of MODES.
+        :param hold_frames: Most frames a note-on may be delayed.
+        :param hold_ms: Optional time limit for the delay (whichever comes first).
+        :param frame_ms: Assumed time the first sample's pressure took to build up from zero.
+        :param min_rate: Rise rate (pressure units per second) for velocity 1.
+        :param max_rate: Rise rate for velocity 127; the range between is logarithmic.
+        :param exponent: Velocity curve shape (1 linear, >1 softer, <1 harder).
+        :param latency_window: Number of recent note-on delays kept for the metrics.
+        """
+        self.tracker = tracker
+        self.history = tracker.history
+        self.mode = mode
+        self.hold_frames = hold_frames
+        self.hold_ms = hold_ms
+        self.frame_s = frame_ms / 1000
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.exponent = exponent
+        self.table = None
+        self.build_table()
+
+        # Note-ons being held back, per track slot
+        max_tracks = self.history.max_tracks
+        self.pending_owner = np.full(max_tracks, -1, dtype=np.int64)
+        self.pending_birth = np.zeros(max_tracks)  # Birth time of the touch being held
+        self.pending_frames = np.zeros(max_tracks, dtype=np.int64)
+        self.pending_start = np.zeros(max_tracks)
+
+        self.latencies_ms = collections.deque(maxlen=latency_window)  # Added note-on delay
+
+    def build_table(self):
+        """Velocity for 128 evenly spaced normalized rise rates."""
+        level = np.linspace(0, 1, 128) ** self.exponent
+        self.table = (1 + np.rint(126 * level)).astype(np.int64)
+
+    def set_exponent(self, exponent):
+        if exponent != self.exponent:
+            self.exponent = exponent
+            self.build_table()
+
+    def estimate(self, slot, blob_id, size):
+        """
+        Velocity for a touch that wants to start a note this frame.
+        :param slot: Track slot of the touch.
+        :param blob_id: Track ID (a new ID in the slot restarts the hold).
+        :param size: Blob diameter, for "size" mode.
+        :return: Velocity 1-127, or None while the note-on is still held back.
+        """
+        if self.mode == "size":
+            return max(1, min(127, int(size * 2)))
+
+        now = self.tracker.time
+        if self.mode == "slope":
+            birth = self.tracker.birth_time[slot]
+            detected = self.tracker.state[slot] == ACTIVE
+            if self.pending_owner[slot] != blob_id or self.pending_birth[slot] != birth:
+                # A new touch; IDs are reused, so its birth time tells it from an earlier one
+                self.pending_owner[slot] = blob_id
+                self.pending_birth[slot] = birth
+                self.pending_frames[slot] = 0
+                self.pending_start[slot] = now
+            elif detected:
+                self.pending_frames[slot] += 1  # Coasting frames bring no new pressure sample
+
+            held_ms = float(now - self.pending_start[slot]) * 1000
+            done = self.pending_frames[slot] >= self.hold_frames or \
+                (self.hold_ms is not None and held_ms >= self.hold_ms) or \
+                (detected and self._pressure_falling(slot))
+            if not done:
+                return None
+            self.pending_owner[slot] = -1
+            self.latencies_ms.append(held_ms)
+        else:
+            self.latencies_ms.append(0.0)
+
+        return self.velocity_for_rate(self.rise_rate(slot))
+
+    def rise_rate(self, slot):
+        """Fastest pressure rise between the touch's samples, counting up from zero before the first."""
+        count = self.history.count[slot]
+        length = self.history.history_len
+        if count <= length:
+            samples = self.history.buffer[slot, :count]
+            start = 0.0  # The touch landed just before its first sample
+        else:
+            # Ring has wrapped: the landing is no longer in the history
+            samples = self.history.buffer[slot, (np.arange(length) + count) % length]
+            start = samples[0, HIST_PRESSURE]
+        pressure = samples[:, HIST_PRESSURE]
+        times = samples[:, HIST_TIME]
+        rise = np.diff(pressure, prepend=start)
+        dt = np.diff(times, prepend=times[0] - self.frame_s)
+        return float(np.max(rise / np.maximum(dt, 1e-6)))
+
+    def velocity_for_rate(self, rate):
+        level = np.log(max(rate, self.min_rate) / self.min_rate) / \
+            np.log(self.max_rate / self.min_rate)
+        return int(self.table[int(round(min(level, 1.0) * 127))])
+
+    def _pressure_falling(self, slot):
+        """Pressure peaked: waiting longer cannot raise the estimate."""
+        count = self.history.count[slot]
+        if count < 2:
+            return False
+        length = self.history.history_len
+        pressure = self.history.buffer[slot, :, HIST_PRESSURE]
+        return pressure[(count - 1) % length] <= pressure[(count - 2) % length]
+
+    def metrics(self):
+        """Added note-on delay in milliseconds."""
+        return {
+            "mode": self.mode,
+            "notes": len(self.latencies_ms),
+            **window_stats(self.latencies_ms, "delay_ms"),
+        }
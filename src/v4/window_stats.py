@@ -0,0 +1,14 @@
+def window_stats(values, prefix):
+    """
+    Mean, 95th percentile and maximum of a window of recent timings (e.g. a bounded deque).
+    :param prefix: Key prefix, e.g. "latency_ms" gives latency_ms_mean, _p95 and _max.
+    :return: Dict of floats; all 0.0 when the window is empty.
+    """
+    values = sorted(values)
+    if not values:
+        return {f"{prefix}_mean": 0.0, f"{prefix}_p95": 0.0, f"{prefix}_max": 0.0}
+    return {
+        f"{prefix}_mean": sum(values) / len(values),
+        f"{prefix}_p95": values[int(0.95 * (len(values) - 1))],
+        f"{prefix}_max": values[-1],
+    }